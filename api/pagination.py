@@ -0,0 +1,48 @@
+import base64
+import binascii
+import json
+
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 50
+
+
+def get_page_size(request, default=SEARCH_PAGE_SIZE, maximum=SEARCH_MAX_PAGE_SIZE):
+    """
+    Reads ?page_size=, clamped to the server-enforced maximum.
+    """
+    try:
+        page_size = int(request.query_params.get('page_size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, maximum))
+
+
+def encode_cursor(*position):
+    """
+    Encodes a keyset position (e.g. the sort values of the last row) as an opaque token.
+    """
+    raw = json.dumps(list(position), separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a token made by encode_cursor back into the list of position values.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise NotFound('Invalid cursor')
+    if not isinstance(position, list) or not position:
+        raise NotFound('Invalid cursor')
+    return position
+
+
+def next_page_url(request, cursor):
+    if cursor is None:
+        return None
+    return replace_query_param(request.build_absolute_uri(), 'cursor', cursor)
@@ -1,3 +1,4 @@
+import base64
 from rest_framework import serializers
 from scammers.models import (
     Scammer,
@@ -8,8 +9,32 @@ from scammers.models import (
     ScammerImage,
     Tag,
     ScammerPaymentAccount,
-    ScammerProfile
+    ScammerProfile,
+    IdentifierFilter
 )
+from scammers.identifiers import LOOKUP_KINDS
+
+# Upper bound on identifiers accepted by one batch lookup request
+MAX_LOOKUP_IDENTIFIERS = 500
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    Takes an optional `fields` argument naming the fields to serialize, and prefetches
+    only the relations among them (listed in `prefetch_fields`).
+    """
+    prefetch_fields = []
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    @classmethod
+    def prefetch(cls, queryset, fields=None):
+        lookups = [name for name in cls.prefetch_fields if fields is None or name in fields]
+        return queryset.prefetch_related(*lookups)
 
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
@@ -46,7 +71,7 @@ class ScammerPaymentAccountSerializer(serializers.ModelSerializer):
         model = ScammerPaymentAccount
         fields = ['id', 'account_number']
 
-class ScammerSerializer(serializers.ModelSerializer):
+class ScammerSerializer(DynamicFieldsModelSerializer):
     url = serializers.HyperlinkedIdentityField(view_name='scammer-detail')
     tags = TagSerializer(many=True, read_only=True)
     names = ScammerNameSerializer(many=True, read_only=True)
@@ -57,6 +82,11 @@ class ScammerSerializer(serializers.ModelSerializer):
     payment_accounts = ScammerPaymentAccountSerializer(many=True, read_only=True)
     related_scammers = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
 
+    prefetch_fields = [
+        'tags', 'related_scammers', 'names', 'phone_numbers', 'emails',
+        'websites', 'images', 'payment_accounts'
+    ]
+
     class Meta:
         model = Scammer
         fields = [
@@ -65,9 +95,44 @@ class ScammerSerializer(serializers.ModelSerializer):
             'websites', 'images', 'payment_accounts'
         ]
 
+class ScammerCaseSummarySerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='scammer-detail')
+    name = serializers.CharField(source='first_name', read_only=True, default=None)
+
+    class Meta:
+        model = Scammer
+        fields = ['url', 'id', 'name', 'status', 'approved_at']
+
 class ScammerProfileSerializer(serializers.ModelSerializer):
-    cases = ScammerSerializer(many=True, read_only=True)
+    """
+    Compact profile: the number of linked cases and summaries of the first few.
+    The full list is served by /api/scammerprofiles/{id}/cases/.
+    """
+    case_count = serializers.IntegerField(read_only=True)
+    cases = ScammerCaseSummarySerializer(source='case_summaries', many=True, read_only=True)
+    cases_url = serializers.HyperlinkedIdentityField(view_name='scammerprofile-cases')
 
     class Meta:
         model = ScammerProfile
-        fields = ['id', 'name', 'image', 'cases']
+        fields = ['id', 'name', 'image', 'case_count', 'cases', 'cases_url']
+
+class IdentifierSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=LOOKUP_KINDS)
+    value = serializers.CharField(max_length=2048)
+
+class IdentifierLookupSerializer(serializers.Serializer):
+    identifiers = IdentifierSerializer(many=True, allow_empty=False, max_length=MAX_LOOKUP_IDENTIFIERS)
+
+class IdentifierFilterSerializer(serializers.ModelSerializer):
+    type = serializers.CharField(source='filter_type')
+    items = serializers.IntegerField(source='item_count')
+    bits = serializers.IntegerField(source='bit_count')
+    hashes = serializers.IntegerField(source='hash_count')
+    data = serializers.SerializerMethodField()
+
+    class Meta:
+        model = IdentifierFilter
+        fields = ['version', 'type', 'created_at', 'items', 'bits', 'hashes', 'data']
+
+    def get_data(self, obj):
+        return base64.b64encode(bytes(obj.data)).decode('ascii')
@@ -11,9 +11,17 @@ router.register(r'scammerwebsites', views.ScammerWebsiteViewSet)
 router.register(r'scammerimages', views.ScammerImageViewSet)
 router.register(r'tags', views.TagViewSet)
 router.register(r'scammerpaymentaccounts', views.ScammerPaymentAccountViewSet)
-router.register(r'scammerprofiles', views.ScammerProfileViewSet)
+router.register(r'scammerprofiles', views.ScammerProfileViewSet, basename='scammerprofile')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('search/', views.SearchView.as_view(), name='scammer-search'),
+    path('search/health/', views.SearchHealthView.as_view(), name='search-health'),
+    path('lookup/', views.IdentifierLookupView.as_view(), name='identifier-lookup'),
+    path('autocomplete/tags/', views.TagAutocompleteView.as_view(), name='tag-autocomplete'),
+    path('autocomplete/names/', views.NameAutocompleteView.as_view(), name='name-autocomplete'),
+    path('autocomplete/cases/', views.CaseAutocompleteView.as_view(), name='case-autocomplete'),
+    path('identifier-filter/', views.IdentifierFilterView.as_view(), name='identifier-filter'),
+    path('export/scammers.ndjson', views.ScammerExportView.as_view(), {'export_format': 'ndjson'}, name='scammer-export-ndjson'),
+    path('export/scammers.csv', views.ScammerExportView.as_view(), {'export_format': 'csv'}, name='scammer-export-csv'),
 ]
@@ -1,7 +1,17 @@
+import json
+
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.views import APIView
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from django.db.models import Q
+from rest_framework.renderers import JSONRenderer
+from django.db.models import Count, Prefetch
+from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError, NotFound
+from django.utils.decorators import method_decorator
 from scammers.models import (
     Scammer,
     ScammerName,
@@ -13,6 +23,8 @@ from scammers.models import (
     ScammerPaymentAccount,
     ScammerProfile
 )
+from scammers.identifiers import identifier_kind, normalize_identifier, batch_lookup, IDENTIFIER_FIELDS
+from api.pagination import get_page_size, encode_cursor, decode_cursor, next_page_url
 from api.serializers import (
     ScammerSerializer,
     ScammerNameSerializer,
@@ -22,67 +34,319 @@ from api.serializers import (
     ScammerImageSerializer,
     TagSerializer,
     ScammerPaymentAccountSerializer,
-    ScammerProfileSerializer
+    ScammerProfileSerializer,
+    IdentifierLookupSerializer,
+    IdentifierFilterSerializer
 )
+from scammers.bloom import filters_since
+from scammers.export import iter_export, parse_since
+from scammers.versioning import conditional_on, SCAMMERS, PROFILES
+from scammers import search_cache
+from scammers.graph import neighbourhood, DEFAULT_DEPTH, MAX_DEPTH, DEFAULT_NODE_LIMIT, MAX_NODE_LIMIT
+from scammers.search_backends import get_search_backend
+from scammers.autocomplete import complete_tags, complete_cases, DEFAULT_LIMIT, MAX_LIMIT
+
+def clamped_param(request, name, default, maximum):
+    """
+    Reads a positive integer query parameter, clamped to 1..maximum.
+    """
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        value = default
+    return max(1, min(value, maximum))
+
+def requested_fields(request, serializer_class):
+    """
+    Resolves ?fields= and ?expand= into the list of fields to serialize.
+
+    ?fields=id,names limits the output to those fields. ?expand= adds relations on top;
+    used without ?fields= it adds them to the plain (non-relation) fields only.
+    Returns None when neither is given, meaning every field.
+    """
+    def parse(name):
+        value = request.query_params.get(name, '')
+        return [part.strip() for part in value.split(',') if part.strip()]
+
+    fields, expand = parse('fields'), parse('expand')
+    if not fields and not expand:
+        return None
+
+    all_fields = serializer_class.Meta.fields
+    if not fields:
+        fields = [name for name in all_fields if name not in serializer_class.prefetch_fields]
+    wanted = set(fields) | set(expand)
+    return [name for name in all_fields if name in wanted]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializes only the requested fields and prefetches only the relations they need,
+    so a list page costs the same number of queries regardless of its size.
+    """
+
+    def get_requested_fields(self):
+        return requested_fields(self.request, self.get_serializer_class())
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return self.get_serializer_class().prefetch(queryset, self.get_requested_fields())
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
 
+
+@method_decorator(conditional_on(SCAMMERS), name='dispatch')
 class SearchView(APIView):
+    """
+    Ranked search over approved scammers through the configured search backend,
+    paginated with an opaque cursor. Only one page of scammers is loaded for serialization.
+    """
+
     def get(self, request, *args, **kwargs):
-        query = request.query_params.get('q', '')
+        query = request.query_params.get('q', '').strip()
         if not query:
-            return Response([])
+            return Response({'next': None, 'results': []})
+
+        data = search_cache.cached(request, 'api_search', {
+            'q': search_cache.normalize_query(query),
+            'cursor': request.query_params.get('cursor'),
+            'page_size': get_page_size(request),
+            'fields': request.query_params.get('fields'),
+            'expand': request.query_params.get('expand'),
+            'base_url': request.build_absolute_uri('/'),
+        }, lambda: self.search_page(request, query))
+        return Response(data)
 
-        # Search across related models
-        name_scammers = ScammerName.objects.filter(name__icontains=query).values_list('scammer_id', flat=True)
-        phone_scammers = ScammerPhoneNumber.objects.filter(phone_number__icontains=query).values_list('scammer_id', flat=True)
-        email_scammers = ScammerEmail.objects.filter(email__icontains=query).values_list('scammer_id', flat=True)
-        website_scammers = ScammerWebsite.objects.filter(website__icontains=query).values_list('scammer_id', flat=True)
-        payment_scammers = ScammerPaymentAccount.objects.filter(account_number__icontains=query).values_list('scammer_id', flat=True)
-        tag_scammers = Tag.objects.filter(name__icontains=query).values_list('scammer', flat=True)
+    def search_page(self, request, query):
+        page_size = get_page_size(request)
+        cursor = request.query_params.get('cursor')
+        backend = get_search_backend()
 
-        # Search in Scammer model itself
-        description_scammers = Scammer.objects.filter(description__icontains=query).values_list('id', flat=True)
+        # Phone- and email-shaped queries take the backend's exact identifier path first.
+        # The cursor records which mode its page came from.
+        search_field = identifier_kind(query) or 'all'
+        after = None
+        if cursor:
+            search_field, *after = decode_cursor(cursor)
+            if search_field not in ('all', identifier_kind(query)):
+                raise NotFound('Invalid cursor')
+        try:
+            page_ids, next_position = backend.scammer_ids(query, search_field, after=after, limit=page_size)
+            if not page_ids and not cursor and search_field != 'all':
+                # Nothing carries this identifier; it may still appear as text, e.g. inside an account number
+                search_field = 'all'
+                page_ids, next_position = backend.scammer_ids(query, search_field, limit=page_size)
+        except (ValueError, TypeError, IndexError):
+            raise NotFound('Invalid cursor')
+        next_cursor = encode_cursor(search_field, *next_position) if next_position else None
 
-        # Combine all scammer ids
-        scammer_ids = set(list(name_scammers) + list(phone_scammers) + list(email_scammers) + list(website_scammers) + list(payment_scammers) + list(tag_scammers) + list(description_scammers))
+        fields = requested_fields(request, ScammerSerializer)
+        scammers = ScammerSerializer.prefetch(Scammer.objects.all(), fields).in_bulk(page_ids)
+        results = [scammers[scammer_id] for scammer_id in page_ids if scammer_id in scammers]
 
-        # Get unique Scammer objects
-        queryset = Scammer.objects.filter(id__in=scammer_ids)
+        serializer = ScammerSerializer(results, many=True, fields=fields, context={'request': request})
+        # The page is cached, so store plain JSON data: serializer output holds Hyperlink
+        # objects whose pickling would query each scammer's name again
+        return json.loads(JSONRenderer().render({
+            'next': next_page_url(request, next_cursor),
+            'results': serializer.data,
+        }))
+
+class SearchHealthView(APIView):
+    """
+    Which search backend is active, and the circuit breaker state and counters
+    when it has one.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_search_backend().health())
 
-        serializer = ScammerSerializer(queryset, many=True, context={'request': request})
-        return Response(serializer.data)
+class IdentifierLookupView(APIView):
+    """
+    Looks up many typed identifiers (phone, email, domain, account) in one request.
+    Each identifier type is answered with a single set-based query.
+    """
 
-class ScammerViewSet(viewsets.ReadOnlyModelViewSet):
+    def post(self, request, *args, **kwargs):
+        serializer = IdentifierLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        identifiers = [(item['type'], item['value']) for item in serializer.validated_data['identifiers']]
+
+        matches = batch_lookup(identifiers)
+
+        results = []
+        for kind, value in identifiers:
+            normalized = normalize_identifier(kind, value)
+            results.append({
+                'type': kind,
+                'value': value,
+                'normalized': normalized,
+                'matches': [
+                    {'scammer_id': scammer_id, 'field': IDENTIFIER_FIELDS[kind]}
+                    for scammer_id in matches.get((kind, normalized), [])
+                ],
+            })
+        return Response({'results': results})
+
+class IdentifierFilterView(APIView):
+    """
+    Serves the Bloom filters over approved identifiers. With ?since=<version> only the
+    filters published after that version are returned; OR their answers together.
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            since = int(request.query_params['since'])
+        except (KeyError, ValueError):
+            since = None
+
+        filters = filters_since(since)
+        version = filters[-1].version if filters else since
+        serializer = IdentifierFilterSerializer(filters, many=True)
+        return Response({'version': version, 'filters': serializer.data})
+
+class AutocompleteView(APIView):
+    """
+    Top-k prefix matches for ?q=, at most ?limit= of them.
+    """
+
+    def complete(self, query, limit):
+        """
+        Returns up to `limit` matches for the non-empty query.
+        """
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '').strip()
+        limit = clamped_param(request, 'limit', DEFAULT_LIMIT, MAX_LIMIT)
+        return Response({'results': self.complete(query, limit) if query else []})
+
+class TagAutocompleteView(AutocompleteView):
+    def complete(self, query, limit):
+        return complete_tags(query, limit)
+
+class NameAutocompleteView(AutocompleteView):
+    def complete(self, query, limit):
+        return get_search_backend().complete_names(query, limit)
+
+class CaseAutocompleteView(AutocompleteView):
+    """
+    Case ids for the profile form; pending and rejected cases are included, so staff only.
+    """
+    permission_classes = [IsAdminUser]
+
+    def complete(self, query, limit):
+        return complete_cases(query, limit)
+
+class ScammerExportView(APIView):
+    """
+    Streams every approved scammer as NDJSON or CSV in constant memory.
+    ?since=<ISO date or datetime> limits the export to cases approved from then on.
+    """
+    content_types = {
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+        'csv': 'text/csv; charset=utf-8',
+    }
+
+    def get(self, request, export_format, *args, **kwargs):
+        try:
+            since = parse_since(request.query_params.get('since'))
+        except ValueError as e:
+            raise ValidationError({'since': str(e)})
+
+        response = StreamingHttpResponse(
+            iter_export(export_format, since=since),
+            content_type=self.content_types[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="scammers.{export_format}"'
+        return response
+
+@method_decorator(conditional_on(SCAMMERS), name='dispatch')
+class ScammerViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Scammer.objects.all()
     serializer_class = ScammerSerializer
 
+    @action(detail=True)
+    def graph(self, request, pk=None):
+        """
+        Approved scammers within ?depth= hops of this one, at most ?limit= of them, nearest first.
+        """
+        # The walk only follows approved scammers, so it must start from one too. Looked up
+        # directly: the viewset queryset would prefetch every serializer field for nothing.
+        scammer = get_object_or_404(Scammer, pk=pk, status='approved')
+        depth = clamped_param(request, 'depth', DEFAULT_DEPTH, MAX_DEPTH)
+        limit = clamped_param(request, 'limit', DEFAULT_NODE_LIMIT, MAX_NODE_LIMIT)
+
+        data = search_cache.cached(request, 'scammer_graph', {
+            'scammer': scammer.pk,
+            'depth': depth,
+            'limit': limit,
+        }, lambda: neighbourhood(scammer.pk, depth, limit))
+        return Response({'id': scammer.pk, 'depth': depth, 'limit': limit, **data})
+
+@method_decorator(conditional_on(SCAMMERS), name='dispatch')
 class ScammerNameViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ScammerName.objects.all()
     serializer_class = ScammerNameSerializer
 
+@method_decorator(conditional_on(SCAMMERS), name='dispatch')
 class ScammerPhoneNumberViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ScammerPhoneNumber.objects.all()
     serializer_class = ScammerPhoneNumberSerializer
 
+@method_decorator(conditional_on(SCAMMERS), name='dispatch')
 class ScammerEmailViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ScammerEmail.objects.all()
     serializer_class = ScammerEmailSerializer
 
+@method_decorator(conditional_on(SCAMMERS), name='dispatch')
 class ScammerWebsiteViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ScammerWebsite.objects.all()
     serializer_class = ScammerWebsiteSerializer
 
+@method_decorator(conditional_on(SCAMMERS), name='dispatch')
 class ScammerImageViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ScammerImage.objects.all()
     serializer_class = ScammerImageSerializer
 
+@method_decorator(conditional_on(SCAMMERS), name='dispatch')
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
 
+@method_decorator(conditional_on(SCAMMERS), name='dispatch')
 class ScammerPaymentAccountViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ScammerPaymentAccount.objects.all()
     serializer_class = ScammerPaymentAccountSerializer
 
+class ProfileCasePagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+@method_decorator(conditional_on(SCAMMERS, PROFILES), name='dispatch')
 class ScammerProfileViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ScammerProfile.objects.all()
     serializer_class = ScammerProfileSerializer
+
+    # Number of case summaries embedded in each profile
+    case_preview_size = 5
+
+    def get_queryset(self):
+        case_summaries = Scammer.objects.with_first_name().order_by('-pk')
+        # A sliced Prefetch fetches the first few cases of every profile in one windowed query
+        return ScammerProfile.objects.annotate(case_count=Count('cases')).prefetch_related(
+            Prefetch('cases', queryset=case_summaries[:self.case_preview_size], to_attr='case_summaries')
+        ).order_by('pk')
+
+    @action(detail=True, pagination_class=ProfileCasePagination)
+    def cases(self, request, pk=None):
+        profile = get_object_or_404(ScammerProfile, pk=pk)
+        fields = requested_fields(request, ScammerSerializer)
+        queryset = ScammerSerializer.prefetch(profile.cases.order_by('-pk'), fields)
+
+        page = self.paginate_queryset(queryset)
+        serializer = ScammerSerializer(page, many=True, fields=fields, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
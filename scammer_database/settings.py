@@ -77,6 +77,18 @@ INSTALLED_APPS = [
 
 ELASTICSEARCH_HOSTS = os.environ.get('ELASTICSEARCH_HOSTS', None)
 
+# Without a configured cluster, search is served by the SQLite FTS5 tables (scammers/fts.py)
+# and documents are not pushed to Elasticsearch on save.
+ELASTICSEARCH_ENABLED = bool(ELASTICSEARCH_HOSTS)
+ELASTICSEARCH_DSL_AUTOSYNC = ELASTICSEARCH_ENABLED
+
+# Saves only mark documents dirty; `manage.py process_search_outbox --loop` pushes them to the cluster.
+ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = 'scammers.search_queue.OutboxSignalProcessor'
+
+# Outbox entries whose documents keep failing to index are dropped after this many tries;
+# `manage.py reindex_search` brings them back.
+SEARCH_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('SEARCH_OUTBOX_MAX_ATTEMPTS', 5))
+
 if ELASTICSEARCH_HOSTS:
     ELASTICSEARCH_DSL = {
         'default': {
@@ -95,6 +107,16 @@ else:
         }
     }
 
+# Interactive searches use their own connection: a slow cluster fails fast and the
+# search backend falls back to the database instead of holding a worker.
+ELASTICSEARCH_SEARCH_TIMEOUT = float(os.environ.get('ELASTICSEARCH_SEARCH_TIMEOUT', 2))
+ELASTICSEARCH_DSL['search'] = {
+    **ELASTICSEARCH_DSL['default'],
+    'request_timeout': ELASTICSEARCH_SEARCH_TIMEOUT,
+    'max_retries': 0,
+    'retry_on_timeout': False,
+}
+
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -151,6 +173,23 @@ DATABASES = {
     )
 }
 
+# Search engine behind the site and API search (see scammers/search_backends.py)
+_DATABASE_SEARCH_BACKEND = (
+    'PostgresSearchBackend' if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql'
+    else 'SQLiteFTSSearchBackend'
+)
+_DEFAULT_SEARCH_BACKEND = 'ElasticsearchSearchBackend' if ELASTICSEARCH_ENABLED else _DATABASE_SEARCH_BACKEND
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', f'scammers.search_backends.{_DEFAULT_SEARCH_BACKEND}')
+# Serves searches while the Elasticsearch circuit breaker is open
+SEARCH_FALLBACK_BACKEND = os.environ.get('SEARCH_FALLBACK_BACKEND', f'scammers.search_backends.{_DATABASE_SEARCH_BACKEND}')
+SEARCH_BREAKER_FAILURES = int(os.environ.get('SEARCH_BREAKER_FAILURES', 5))
+SEARCH_BREAKER_COOLDOWN = int(os.environ.get('SEARCH_BREAKER_COOLDOWN', 30))
+
+# Identifier keys shared by more scammers than this (common names) do not link them as related
+RELATED_LINK_MAX_FANOUT = int(os.environ.get('RELATED_LINK_MAX_FANOUT', 50))
+# Trigram similarity (0-1) at which the fuzzy name matcher proposes two scammers as related
+FUZZY_NAME_MIN_SCORE = float(os.environ.get('FUZZY_NAME_MIN_SCORE', 0.5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -243,6 +282,9 @@ PWA_APP_FAVICON = '/static/images/favicon.ico'
 
 FREE_TRIAL_ENABLED = True
 
+# Seconds a search result page stays cached; entries are also invalidated on any data change
+SEARCH_CACHE_TIMEOUT = int(os.environ.get('SEARCH_CACHE_TIMEOUT', 300))
+
 # settings.py
 
 # Secure Cookie and SSL Redirect settings (reads from .env file)
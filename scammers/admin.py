@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
 from django.utils import timezone
+from .signals import scammer_status_changed
 from .models import Scammer, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerImage, Tag, ScammerPaymentAccount, ScammerCustomField, ScammerProfile
 
 class ScammerNameInline(admin.TabularInline):
@@ -44,12 +46,20 @@ class ScammerAdmin(admin.ModelAdmin):
     filter_horizontal = ('tags',)
     actions = ['make_approved', 'make_rejected']
 
+    def _change_status(self, queryset, new_status, **fields):
+        # One transaction, so the receivers' on-commit work (filter rebuilds) runs once for the batch
+        with transaction.atomic():
+            changed = list(queryset.exclude(status=new_status))
+            queryset.update(status=new_status, **fields)
+            for scammer in changed:
+                scammer_status_changed.send(sender=Scammer, instance=scammer, old_status=scammer.status, new_status=new_status)
+
     def make_approved(self, request, queryset):
-        queryset.update(status='approved', approved_at=timezone.now())
+        self._change_status(queryset, 'approved', approved_at=timezone.now())
     make_approved.short_description = "Mark selected scammers as Approved"
 
     def make_rejected(self, request, queryset):
-        queryset.update(status='rejected', approved_at=None)
+        self._change_status(queryset, 'rejected', approved_at=None)
     make_rejected.short_description = "Mark selected scammers as Rejected"
 
 @admin.register(Tag)
@@ -0,0 +1,77 @@
+"""
+Prefix completion behind the tag and case pickers of the submission and profile
+forms, so those pages no longer embed every tag name or case id.
+"""
+import bisect
+import threading
+
+from django.db.models import Q
+
+from .models import ResourceVersion, Scammer, Tag
+from .versioning import TAGS
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+class TagPrefixIndex:
+    """
+    Case-folded tag names kept sorted in memory and searched with bisect. The index
+    is rebuilt when the tags resource version moves, so every process sees new tags.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.entries = ([], [])
+        self.lock = threading.Lock()
+
+    def _ensure(self, version):
+        if version == self.version:
+            return
+        with self.lock:
+            if version == self.version:
+                return
+            pairs = sorted((name.casefold(), name) for name in Tag.objects.values_list('name', flat=True))
+            self.entries = ([key for key, name in pairs], [name for key, name in pairs])
+            self.version = version
+
+    def complete(self, prefix, limit, version):
+        self._ensure(version)
+        keys, names = self.entries
+        prefix = prefix.casefold()
+        results = []
+        for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+            if len(results) >= limit or not keys[i].startswith(prefix):
+                break
+            results.append(names[i])
+        return results
+
+
+tag_index = TagPrefixIndex()
+
+
+def complete_tags(prefix, limit=DEFAULT_LIMIT):
+    version = ResourceVersion.objects.filter(name=TAGS).values_list('version', flat=True).first() or 0
+    return tag_index.complete(prefix, limit, version)
+
+
+def complete_cases(query, limit=DEFAULT_LIMIT):
+    """
+    Cases whose id equals the query or whose name starts with it, newest first,
+    as Tagify whitelist entries.
+    """
+    condition = Q(names__name__istartswith=query)
+    if query.isdigit():
+        condition |= Q(pk=int(query))
+    return case_entries(Scammer.objects.filter(condition).order_by('-pk'), limit)
+
+
+def case_entries(queryset, limit=None):
+    """
+    Tagify whitelist entries for the cases in a Scammer queryset.
+    """
+    cases = queryset.with_first_name().values('pk', 'first_name').distinct()[:limit]
+    return [
+        {'value': str(case['pk']), 'name': case['first_name'] or '', 'searchBy': case['first_name'] or ''}
+        for case in cases
+    ]
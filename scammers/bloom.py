@@ -0,0 +1,160 @@
+"""
+Versioned Bloom-filter snapshots of the identifiers of approved scammers, so the
+browser extension can rule out most lookups locally.
+
+Clients test membership of "<kind>:<normalized value>" (see scammers/identifiers.py)
+with the scheme below, and only ask the server when some published filter says yes:
+
+    digest = blake2b(key.encode('utf-8'), digest_size=16)
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    bit i (for i in range(hashes)) = (h1 + i * h2) % bits
+    bit p is set when data[p // 8] & (1 << (p % 8))
+"""
+import hashlib
+import math
+
+from django.db import transaction
+
+from .models import ScammerIdentifier, IdentifierFilter
+
+# Identifier kinds published in the filter
+FILTER_KINDS = ('phone', 'email', 'domain', 'account')
+
+FALSE_POSITIVE_RATE = 0.001
+MIN_BITS = 64
+
+
+class BloomFilter:
+    def __init__(self, bits, hashes, data=None):
+        self.bits = bits
+        self.hashes = hashes
+        self.data = bytearray(data) if data is not None else bytearray((bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, false_positive_rate=FALSE_POSITIVE_RATE):
+        capacity = max(capacity, 1)
+        bits = max(MIN_BITS, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        hashes = max(1, round(-math.log2(false_positive_rate)))
+        return cls(bits, hashes)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.data[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.data[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def filter_key(kind, value):
+    return f'{kind}:{value}'
+
+
+def _approved_identifiers(**filters):
+    return ScammerIdentifier.objects.filter(
+        kind__in=FILTER_KINDS, scammer__status='approved', **filters
+    ).values_list('kind', 'value')
+
+
+def _save_filter(bloom, filter_type, item_count):
+    return IdentifierFilter.objects.create(
+        filter_type=filter_type,
+        item_count=item_count,
+        bit_count=bloom.bits,
+        hash_count=bloom.hashes,
+        data=bytes(bloom.data),
+    )
+
+
+def publish_full_filter(chunk_size=5000):
+    """
+    Builds a filter over every approved identifier and publishes it as a new version.
+    Older versions are dropped, since clients behind a full filter must download it anyway.
+    """
+    identifiers = _approved_identifiers()
+    bloom = BloomFilter.for_capacity(identifiers.count())
+    item_count = 0
+    for kind, value in identifiers.iterator(chunk_size=chunk_size):
+        bloom.add(filter_key(kind, value))
+        item_count += 1
+
+    with transaction.atomic():
+        snapshot = _save_filter(bloom, IdentifierFilter.FULL, item_count)
+        IdentifierFilter.objects.filter(version__lt=snapshot.version).delete()
+    return snapshot
+
+
+def publish_delta_filter(scammer_id, kind=None, values=None):
+    """
+    Publishes a small filter holding the identifiers of a newly approved scammer, or
+    only the given keys of one kind when an approved scammer gains new identifiers.
+    """
+    filters = {'scammer_id': scammer_id}
+    if kind is not None:
+        filters.update(kind=kind, value__in=values)
+    keys = [filter_key(kind, value) for kind, value in _approved_identifiers(**filters)]
+    if not keys:
+        return None
+    if not IdentifierFilter.objects.filter(filter_type=IdentifierFilter.FULL).exists():
+        return publish_full_filter()
+
+    bloom = BloomFilter.for_capacity(len(keys))
+    for key in keys:
+        bloom.add(key)
+    return _save_filter(bloom, IdentifierFilter.DELTA, len(keys))
+
+
+def filters_since(version=None):
+    """
+    Returns the filters a client at `version` needs, oldest first: either only the
+    deltas published after it, or the latest full filter followed by its deltas.
+    """
+    latest_full = IdentifierFilter.objects.filter(filter_type=IdentifierFilter.FULL).order_by('-version').first()
+    if latest_full is None:
+        return []
+    if version is None or version < latest_full.version:
+        version = latest_full.version - 1
+    return list(IdentifierFilter.objects.filter(version__gt=version).order_by('version'))
+
+
+def handle_status_change(scammer_id, old_status, new_status):
+    """
+    Keeps the published filters current when a scammer is approved or rejected.
+    Bloom filters cannot forget keys, so leaving 'approved' triggers a full rebuild.
+    """
+    if old_status == new_status:
+        return
+    if new_status == 'approved':
+        transaction.on_commit(lambda: publish_delta_filter(scammer_id))
+    elif old_status == 'approved':
+        schedule_full_filter()
+
+
+def schedule_full_filter():
+    """
+    Publishes a full filter once the current transaction commits. A bulk rejection
+    queues a single rebuild, however many scammers leave 'approved' in it.
+    """
+    connection = transaction.get_connection()
+    # Callbacks of rolled-back savepoints are dropped from this list, so a rebuild is never lost
+    if any(callback is publish_full_filter for _savepoints, callback, *_rest in connection.run_on_commit):
+        return
+    transaction.on_commit(publish_full_filter)
+
+
+def handle_identifiers_added(scammer_id, kind, values):
+    """
+    Publishes the keys added to an approved scammer's identifiers, which would
+    otherwise be missing from every filter until the next full rebuild.
+    """
+    if kind not in FILTER_KINDS or not values:
+        return
+    values = set(values)
+    transaction.on_commit(lambda: publish_delta_filter(scammer_id, kind, values))
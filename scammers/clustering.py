@@ -0,0 +1,146 @@
+"""
+Groups scammers into clusters: the connected components of the graph in which two
+scammers are joined when they share a normalized name, phone, email or payment
+account key (see scammers/identifiers.py).
+
+rebuild() recomputes every cluster from one streaming pass over the identifier
+index. Between rebuilds the signals in scammers/signals.py merge clusters as new
+keys arrive. Merging never splits a cluster, so a deleted identifier only takes
+effect at the next rebuild. A cluster is identified by the smallest scammer id
+in it; scammers that share nothing with anyone have no cluster_id.
+"""
+from itertools import groupby
+
+from django.conf import settings
+from django.db.models import Count, Exists, OuterRef, Q
+
+from .models import Scammer, ScammerIdentifier, ScammerProfile
+
+# Identifier kinds that join scammers, as for related-scammer linking
+CLUSTER_KINDS = ('name', 'phone', 'email', 'account')
+
+
+class UnionFind:
+    """
+    Disjoint sets of scammer ids. The root of each set is its smallest id.
+    """
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent
+        root = parent.setdefault(item, item)
+        while root != parent[root]:
+            # Path halving keeps the trees flat without recursion
+            parent[root] = parent[parent[root]]
+            root = parent[root]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def __contains__(self, item):
+        return item in self.parent
+
+
+def max_fanout():
+    return getattr(settings, 'RELATED_LINK_MAX_FANOUT', 50)
+
+
+def build_components(chunk_size=5000):
+    """
+    Streams the identifier index in (kind, value) order and unions the scammers of
+    each key. Keys shared by more than RELATED_LINK_MAX_FANOUT scammers are skipped.
+    Only scammers that share at least one key end up in the returned UnionFind.
+    """
+    components = UnionFind()
+    rows = (
+        ScammerIdentifier.objects.filter(kind__in=CLUSTER_KINDS)
+        .order_by('kind', 'value', 'scammer_id')
+        .values_list('kind', 'value', 'scammer_id')
+        .iterator(chunk_size=chunk_size)
+    )
+    limit = max_fanout() + 1
+    for _key, group in groupby(rows, key=lambda row: row[:2]):
+        scammer_ids = []
+        for row in group:
+            # Keep consuming the group, but stop collecting once it is too common to use
+            if len(scammer_ids) <= limit:
+                scammer_ids.append(row[2])
+        if 2 <= len(scammer_ids) <= limit:
+            first = scammer_ids[0]
+            for scammer_id in scammer_ids[1:]:
+                components.union(first, scammer_id)
+    return components
+
+
+def rebuild(chunk_size=5000):
+    """
+    Recomputes every cluster_id and writes only the ones that changed.
+    Returns (scammers updated, scammers in clusters).
+    """
+    components = build_components(chunk_size)
+    updated = 0
+    changed = []
+    rows = Scammer.objects.order_by('pk').values_list('pk', 'cluster_id').iterator(chunk_size=chunk_size)
+    for pk, cluster_id in rows:
+        wanted = components.find(pk) if pk in components else None
+        if wanted != cluster_id:
+            changed.append(Scammer(pk=pk, cluster_id=wanted))
+            if len(changed) >= chunk_size:
+                updated += Scammer.objects.bulk_update(changed, ['cluster_id'])
+                changed = []
+    if changed:
+        updated += Scammer.objects.bulk_update(changed, ['cluster_id'])
+    return updated, len(components.parent)
+
+
+def merge(scammer_id, related_ids):
+    """
+    Merges the clusters of a scammer and the scammers it was just linked to.
+    """
+    if not related_ids:
+        return
+    members = [scammer_id, *related_ids]
+    roots = {
+        cluster_id if cluster_id is not None else pk
+        for pk, cluster_id in Scammer.objects.filter(pk__in=members).values_list('pk', 'cluster_id')
+    }
+    if not roots:
+        return
+    target = min(roots)
+    Scammer.objects.filter(Q(cluster_id__in=roots) | Q(pk__in=members)).exclude(cluster_id=target).update(cluster_id=target)
+
+
+def proposals():
+    """
+    Clusters of two or more approved scammers with at least one member not yet in
+    any profile, largest first, as {'cluster_id', 'size'} rows.
+    """
+    in_profile = Exists(ScammerProfile.cases.through.objects.filter(scammer_id=OuterRef('pk')))
+    return (
+        Scammer.objects.filter(status='approved', cluster_id__isnull=False)
+        .values('cluster_id')
+        .annotate(size=Count('pk'), unprofiled=Count('pk', filter=~in_profile))
+        .filter(size__gte=2, unprofiled__gte=1)
+        .order_by('-size', 'cluster_id')
+    )
+
+
+def cluster_members(cluster_ids):
+    """
+    Returns {cluster id: [approved scammers]} with `first_name` annotated and profiles prefetched.
+    """
+    members = {cluster_id: [] for cluster_id in cluster_ids}
+    scammers = (
+        Scammer.objects.filter(cluster_id__in=members, status='approved')
+        .with_first_name()
+        .prefetch_related('profiles')
+        .order_by('pk')
+    )
+    for scammer in scammers:
+        members[scammer.cluster_id].append(scammer)
+    return members
@@ -1,16 +1,53 @@
 from django_elasticsearch_dsl.registries import registry
 from django_elasticsearch_dsl import Document, fields
-from .models import Scammer, ScammerProfile, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, Tag
-from elasticsearch_dsl import analyzer, tokenizer
+from .models import Scammer, ScammerProfile, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerPaymentAccount, Tag
+from elasticsearch_dsl import analyzer, tokenizer, normalizer, char_filter, token_filter
+from .identifiers import normalize_phone
+
+EDGE_NGRAM_MAX = 15
 
 edge_ngram_analyzer = analyzer(
     'edge_ngram_analyzer',
-    tokenizer=tokenizer('edge_ngram_tokenizer', 'edge_ngram', min_gram=2, max_gram=15, token_chars=['letter', 'digit']),
+    tokenizer=tokenizer('edge_ngram_tokenizer', 'edge_ngram', min_gram=2, max_gram=EDGE_NGRAM_MAX, token_chars=['letter', 'digit']),
     filter=['lowercase']
 )
 
+# Splits queries on the same boundaries edge_ngram_tokenizer uses, without n-gramming them.
+# Longer tokens are cut to the longest indexed gram, or they could never match.
+identifier_search_analyzer = analyzer(
+    'identifier_search_analyzer',
+    tokenizer=tokenizer('identifier_tokenizer', 'char_group', tokenize_on_chars=['whitespace', 'punctuation', 'symbol']),
+    filter=['lowercase', token_filter('identifier_truncate', 'truncate', length=EDGE_NGRAM_MAX)]
+)
+
+digits_only = char_filter('digits_only', 'pattern_replace', pattern='[^0-9]', replacement='')
+
+# Exact-match keys: phones compare on their digits, emails case-insensitively
+phone_normalizer = normalizer('phone_normalizer', char_filter=[digits_only])
+email_normalizer = normalizer('email_normalizer', filter=['lowercase', 'trim'])
+
+# Every leading run of 3-15 digits, so a prefix lookup is a single term query
+phone_prefix_analyzer = analyzer(
+    'phone_prefix_analyzer',
+    tokenizer='keyword',
+    char_filter=[digits_only],
+    filter=[token_filter('phone_edge_ngram', 'edge_ngram', min_gram=3, max_gram=15)]
+)
+
+# Everything a scammer_list card needs, so result pages render from _source alone
+SCAMMER_CARD_FIELDS = ['display_name', 'created_at', 'description', 'tags.name']
+
 @registry.register_document
 class ScammerDocument(Document):
+    # Unique sort tiebreaker for search_after pagination
+    id = fields.IntegerField()
+    status = fields.KeywordField()
+    # Flattened names, phones, emails, websites, payment accounts and tags for the 'all' search mode
+    all_identifiers = fields.TextField(
+        analyzer=edge_ngram_analyzer,
+        search_analyzer=identifier_search_analyzer
+    )
+    display_name = fields.KeywordField(index=False)
     names = fields.NestedField(properties={
         'name': fields.TextField(
             analyzer=edge_ngram_analyzer,
@@ -19,13 +56,22 @@ class ScammerDocument(Document):
     })
     phone_numbers = fields.NestedField(properties={
         'phone_number': fields.TextField(),
+        'e164': fields.KeywordField(
+            normalizer=phone_normalizer,
+            fields={'prefix': fields.TextField(analyzer=phone_prefix_analyzer, search_analyzer='keyword')}
+        ),
     })
     emails = fields.NestedField(properties={
-        'email': fields.TextField(),
+        'email': fields.TextField(
+            fields={'keyword': fields.KeywordField(normalizer=email_normalizer)}
+        ),
     })
     websites = fields.NestedField(properties={
         'website': fields.TextField(),
     })
+    payment_accounts = fields.NestedField(properties={
+        'account_number': fields.TextField(),
+    })
     tags = fields.NestedField(properties={
         'name': fields.TextField(),
     })
@@ -41,14 +87,39 @@ class ScammerDocument(Document):
         model = Scammer
         fields = [
             'description',
+            'created_at',
+            'approved_at',
         ]
-        related_models = [ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, Tag]
+        related_models = [ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerPaymentAccount, Tag]
 
     def get_queryset(self):
         return super().get_queryset().prefetch_related(
-            'names', 'phone_numbers', 'emails', 'websites', 'tags'
+            'names', 'phone_numbers', 'emails', 'websites', 'payment_accounts', 'tags'
         )
 
+    def prepare_phone_numbers(self, instance):
+        return [
+            {'phone_number': phone.phone_number, 'e164': normalize_phone(phone.phone_number)}
+            for phone in instance.phone_numbers.all()
+        ]
+
+    def prepare_all_identifiers(self, instance):
+        # Built here rather than with copy_to, which cannot lift values out of nested objects
+        values = [name.name for name in instance.names.all()]
+        for phone in instance.phone_numbers.all():
+            e164 = normalize_phone(phone.phone_number)
+            values += [phone.phone_number, e164[1:] if e164 else None]
+        values += [email.email for email in instance.emails.all()]
+        values += [website.website for website in instance.websites.all()]
+        values += [account.account_number for account in instance.payment_accounts.all()]
+        values += [tag.name for tag in instance.tags.all()]
+        return [value for value in values if value]
+
+    def prepare_display_name(self, instance):
+        # Same name the list used to show via names.first
+        names = sorted(instance.names.all(), key=lambda name: name.pk)
+        return names[0].name if names else None
+
     def get_indexing_queryset(self):
         return self.get_queryset().iterator(chunk_size=1000)
 
@@ -61,6 +132,8 @@ class ScammerDocument(Document):
             return related_instance.scammer
         if isinstance(related_instance, ScammerWebsite):
             return related_instance.scammer
+        if isinstance(related_instance, ScammerPaymentAccount):
+            return related_instance.scammer
         if isinstance(related_instance, Tag):
             return related_instance.scammer_set.all()
 
@@ -0,0 +1,102 @@
+"""
+Constant-memory export of approved scammers as NDJSON or CSV, shared by the
+/api/export/ endpoint and the export_scammers management command.
+"""
+import csv
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Scammer
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+CSV_COLUMNS = [
+    'id', 'status', 'description', 'created_at', 'approved_at',
+    'names', 'phone_numbers', 'emails', 'websites', 'payment_accounts', 'tags',
+]
+
+# Separator for multi-valued columns in CSV output
+CSV_LIST_SEPARATOR = ' | '
+
+
+def parse_since(value):
+    """
+    Parses a ?since= / --since value given as an ISO date or datetime.
+    Returns None for empty input and raises ValueError for anything unparsable.
+    """
+    if not value:
+        return None
+    since = parse_datetime(value)
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        since = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, datetime.timezone.utc)
+    return since
+
+
+def approved_scammers(since=None, chunk_size=500):
+    """
+    Streams approved scammers in primary-key order through a server-side cursor.
+    Child rows are prefetched per chunk rather than per scammer.
+    """
+    queryset = Scammer.objects.filter(status='approved').order_by('pk').prefetch_related(
+        'names', 'phone_numbers', 'emails', 'websites', 'payment_accounts', 'tags'
+    )
+    if since is not None:
+        queryset = queryset.filter(approved_at__gte=since)
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def export_row(scammer):
+    return {
+        'id': scammer.pk,
+        'status': scammer.status,
+        'description': scammer.description,
+        'created_at': scammer.created_at,
+        'approved_at': scammer.approved_at,
+        'names': [n.name for n in scammer.names.all() if n.name],
+        'phone_numbers': [p.phone_number for p in scammer.phone_numbers.all() if p.phone_number],
+        'emails': [e.email for e in scammer.emails.all() if e.email],
+        'websites': [w.website for w in scammer.websites.all() if w.website],
+        'payment_accounts': [a.account_number for a in scammer.payment_accounts.all() if a.account_number],
+        'tags': [t.name for t in scammer.tags.all()],
+    }
+
+
+def iter_ndjson(scammers):
+    for scammer in scammers:
+        yield json.dumps(export_row(scammer), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """A file-like object whose write() hands back the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(scammers):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for scammer in scammers:
+        row = export_row(scammer)
+        yield writer.writerow([
+            CSV_LIST_SEPARATOR.join(value) if isinstance(value, list)
+            else value.isoformat() if isinstance(value, datetime.datetime)
+            else value
+            for value in (row[column] for column in CSV_COLUMNS)
+        ])
+
+
+def iter_export(export_format, since=None, chunk_size=500):
+    scammers = approved_scammers(since=since, chunk_size=chunk_size)
+    if export_format == 'csv':
+        return iter_csv(scammers)
+    return iter_ndjson(scammers)
@@ -2,6 +2,7 @@ from django import forms
 from django.forms import inlineformset_factory, MultiWidget, Select, TextInput
 from django.utils.translation import gettext_lazy as _
 from .models import Scammer, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerImage, Tag, ScammerPaymentAccount, ScammerCustomField, ScammerProfile
+from .identifiers import join_phone_number
 
 COUNTRY_CODE_CHOICES = [
     ('+93', 'AF (+93)'),
@@ -289,8 +290,7 @@ class PhoneNumberField(forms.MultiValueField):
     def compress(self, data_list):
         if data_list:
             country_code = data_list[0]
-            local_number = data_list[1].lstrip('0') # Remove leading '0'
-            return f'{country_code}{local_number}'
+            return join_phone_number(country_code, data_list[1]) # Removes leading '0'
         return ''
 
 class ScammerForm(forms.ModelForm):
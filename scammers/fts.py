@@ -0,0 +1,192 @@
+"""
+SQLite FTS5 search, used in place of Elasticsearch on deployments that do not
+configure ELASTICSEARCH_HOSTS. The virtual tables mirror ScammerDocument and
+ScammerProfileDocument and are kept in sync by the signals in scammers/signals.py.
+"""
+from django.db import connection
+from django.db.models import Q
+
+from .identifiers import normalize_phone
+from .models import Scammer, ScammerProfile
+
+SCAMMER_FTS_TABLE = 'scammers_scammer_fts'
+PROFILE_FTS_TABLE = 'scammers_scammerprofile_fts'
+
+# search_field -> FTS5 column holding that data
+SEARCH_FIELD_COLUMNS = {
+    'name': 'names',
+    'phone': 'phone_numbers',
+    'email': 'emails',
+    'website': 'websites',
+    'account': 'payment_accounts',
+    'tag': 'tags',
+}
+
+# bm25() weights, in column order: names, phone_numbers, emails, websites, payment_accounts, tags, description
+BM25_WEIGHTS = '10.0, 10.0, 10.0, 5.0, 10.0, 5.0, 1.0'
+
+# Upper bound on the number of ranked ids read for one search
+MAX_RESULTS = 1000
+
+SCAMMER_FTS_INSERT = f'''
+    INSERT INTO {SCAMMER_FTS_TABLE} (rowid, names, phone_numbers, emails, websites, payment_accounts, tags, description)
+    SELECT s.id,
+        (SELECT group_concat(name, ' ') FROM scammers_scammername WHERE scammer_id = s.id),
+        (SELECT group_concat(phone_number, ' ') FROM scammers_scammerphonenumber WHERE scammer_id = s.id),
+        (SELECT group_concat(email, ' ') FROM scammers_scammeremail WHERE scammer_id = s.id),
+        (SELECT group_concat(website, ' ') FROM scammers_scammerwebsite WHERE scammer_id = s.id),
+        (SELECT group_concat(account_number, ' ') FROM scammers_scammerpaymentaccount WHERE scammer_id = s.id),
+        (SELECT group_concat(t.name, ' ') FROM scammers_tag t
+            JOIN scammers_scammer_tags st ON st.tag_id = t.id WHERE st.scammer_id = s.id),
+        s.description
+    FROM scammers_scammer s
+'''
+
+PROFILE_FTS_INSERT = f'''
+    INSERT INTO {PROFILE_FTS_TABLE} (rowid, name)
+    SELECT p.id, p.name FROM scammers_scammerprofile p
+'''
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def refresh_scammer(scammer_id):
+    """
+    Rewrites the FTS row of one scammer from its current database rows.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SCAMMER_FTS_TABLE} WHERE rowid = %s', [scammer_id])
+        cursor.execute(SCAMMER_FTS_INSERT + ' WHERE s.id = %s', [scammer_id])
+
+
+def refresh_profile(profile_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {PROFILE_FTS_TABLE} WHERE rowid = %s', [profile_id])
+        cursor.execute(PROFILE_FTS_INSERT + ' WHERE p.id = %s', [profile_id])
+
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _terms(query, prefix=False):
+    """
+    Turns user input into an OR of quoted FTS5 strings, which mirrors the default
+    Elasticsearch match operator and keeps FTS5 syntax characters inert.
+    """
+    suffix = '*' if prefix else ''
+    return ' OR '.join(_quote(term) + suffix for term in query.split())
+
+
+def _scammer_match_expression(query, search_field):
+    if search_field == 'name':
+        return f'{{names}} : ({_terms(query, prefix=True)})'
+    if search_field == 'phone':
+        # Also match the E.164 digits so "09..." finds numbers stored as "+959..."
+        terms = query.split()
+        normalized = normalize_phone(query)
+        if normalized:
+            terms.append(normalized.lstrip('+'))
+        return f'{{phone_numbers}} : ({_terms(" ".join(terms))})'
+    if search_field in SEARCH_FIELD_COLUMNS:
+        return f'{{{SEARCH_FIELD_COLUMNS[search_field]}}} : ({_terms(query)})'
+    # 'all': names are prefix-matched like the edge n-gram analyzer does in Elasticsearch
+    return f'({{names}} : ({_terms(query, prefix=True)})) OR ({_terms(query)})'
+
+
+def search_scammer_ids(query, search_field='all', offset=0, limit=MAX_RESULTS):
+    """
+    Returns ids of approved scammers matching the query, best BM25 match first,
+    starting at `offset`.
+    """
+    if not query.split():
+        return []
+    if not is_available():
+        return list(_fallback_scammer_ids(query, search_field)[offset:offset + limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            SELECT f.rowid FROM {SCAMMER_FTS_TABLE} f
+            JOIN scammers_scammer s ON s.id = f.rowid
+            WHERE {SCAMMER_FTS_TABLE} MATCH %s AND s.status = 'approved'
+            ORDER BY bm25({SCAMMER_FTS_TABLE}, {BM25_WEIGHTS}), f.rowid DESC
+            LIMIT %s OFFSET %s
+            ''',
+            [_scammer_match_expression(query, search_field), limit, offset]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_profile_ids(query):
+    if not query.split():
+        return []
+    if not is_available():
+        return list(
+            ScammerProfile.objects.filter(name__icontains=query).values_list('id', flat=True)[:MAX_RESULTS]
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            SELECT rowid FROM {PROFILE_FTS_TABLE}
+            WHERE {PROFILE_FTS_TABLE} MATCH %s
+            ORDER BY bm25({PROFILE_FTS_TABLE})
+            LIMIT {MAX_RESULTS}
+            ''',
+            [_terms(query, prefix=True)]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_scammer_ids(query, search_field):
+    # Databases without FTS5 get a plain substring scan over the same fields
+    lookups = {
+        'name': Q(names__name__icontains=query),
+        'phone': Q(phone_numbers__phone_number__icontains=query),
+        'email': Q(emails__email__icontains=query),
+        'website': Q(websites__website__icontains=query),
+        'account': Q(payment_accounts__account_number__icontains=query),
+        'tag': Q(tags__name__icontains=query),
+    }
+    if search_field in lookups:
+        condition = lookups[search_field]
+    else:
+        condition = Q(description__icontains=query)
+        for lookup in lookups.values():
+            condition |= lookup
+    return (
+        Scammer.objects.filter(condition, status='approved')
+        .order_by('-approved_at', '-id').values_list('id', flat=True).distinct()
+    )
+
+
+class RankedResults:
+    """
+    A sequence of model instances in the order of a ranked id list, loading only
+    the slice a Paginator asks for.
+    """
+
+    def __init__(self, model, ids):
+        self.model = model
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        ids = self.ids[index]
+        objects = self.model.objects.in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
+
+
+def search_scammers(query, search_field='all'):
+    return RankedResults(Scammer, search_scammer_ids(query, search_field))
+
+
+def search_profiles(query):
+    return RankedResults(ScammerProfile, search_profile_ids(query))
@@ -0,0 +1,205 @@
+"""
+Near-duplicate name matching with MinHash and locality-sensitive hashing.
+
+Each distinct normalized name (the 'name' keys of the identifier index) gets a
+MinHash signature over its character trigrams, split into bands. Every band is
+stored as one NameSignatureBucket. Two names are only compared when they share a
+bucket, so a batch costs a few indexed lookups instead of a pass over all names.
+With 16 bands of 4 rows, pairs with a trigram Jaccard similarity of about 0.5
+collide in at least one band more often than not.
+
+Compared names scoring at least FUZZY_NAME_MIN_SCORE give NameMatchCandidate rows
+for every pair of scammers carrying them. Pairs that are already related are
+skipped, and so are names shared by more than RELATED_LINK_MAX_FANOUT scammers.
+"""
+import hashlib
+import random
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+from . import clustering
+from .models import Scammer, ScammerIdentifier, NameSignature, NameSignatureBucket, NameMatchCandidate
+
+SHINGLE_SIZE = 3
+BANDS = 16
+ROWS_PER_BAND = 4
+
+# Universal hashing a*x + b mod a Mersenne prime, with fixed coefficients so
+# signatures stay comparable between runs
+_PRIME = (1 << 61) - 1
+_random = random.Random(0x5CA3)
+_COEFFICIENTS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(BANDS * ROWS_PER_BAND)]
+
+# Buckets with more names than this are too unspecific to compare within
+MAX_BUCKET_SIZE = 200
+
+
+def shingles(value):
+    """
+    Character trigrams of a normalized name, padded so word starts and ends count.
+    """
+    padded = f' {value} '
+    if len(padded) <= SHINGLE_SIZE:
+        return {padded}
+    return {padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+
+def similarity(a, b):
+    """
+    Jaccard similarity of the trigram sets of two normalized names.
+    """
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def _hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def signature(value):
+    hashes = [_hash(shingle) for shingle in shingles(value)]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _COEFFICIENTS]
+
+
+def buckets(value):
+    """
+    The LSH bucket of each band of the name's signature, as signed 64-bit integers.
+    The band number is part of the hashed key, so buckets of different bands never meet.
+    """
+    minhash = signature(value)
+    keys = []
+    for band in range(BANDS):
+        rows = minhash[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        raw = f'{band}:' + ','.join(map(str, rows))
+        keys.append(int.from_bytes(hashlib.blake2b(raw.encode('ascii'), digest_size=8).digest(), 'big', signed=True))
+    return keys
+
+
+def unsigned_names():
+    """
+    Distinct name keys of the identifier index that have no signature yet.
+    """
+    signed = NameSignature.objects.filter(value=OuterRef('value'))
+    return (
+        ScammerIdentifier.objects.filter(kind='name').filter(~Exists(signed))
+        .order_by('value').values_list('value', flat=True).distinct()
+    )
+
+
+def prune():
+    """
+    Deletes the signatures of names no scammer carries any more.
+    """
+    named = ScammerIdentifier.objects.filter(kind='name', value=OuterRef('value'))
+    _total, deleted = NameSignature.objects.filter(~Exists(named)).delete()
+    return deleted.get(NameSignature._meta.label, 0)
+
+
+def sign(values):
+    """
+    Stores the signature buckets of the given names and returns {value: buckets}.
+    """
+    signed = {value: buckets(value) for value in values}
+    NameSignature.objects.bulk_create([NameSignature(value=value) for value in signed], ignore_conflicts=True)
+    ids = dict(NameSignature.objects.filter(value__in=signed).values_list('value', 'pk'))
+    NameSignatureBucket.objects.bulk_create([
+        NameSignatureBucket(signature_id=ids[value], bucket=bucket)
+        for value, keys in signed.items() for bucket in keys
+    ])
+    return signed
+
+
+def similar_pairs(signed, min_score):
+    """
+    Returns {(value, other value): score} for the names sharing a bucket with one of
+    the newly signed names and scoring at least min_score.
+    """
+    members = {}
+    rows = NameSignatureBucket.objects.filter(
+        bucket__in={bucket for keys in signed.values() for bucket in keys}
+    ).values_list('bucket', 'signature__value')
+    for bucket, value in rows:
+        members.setdefault(bucket, set()).add(value)
+
+    pairs = {}
+    for value, keys in signed.items():
+        for bucket in keys:
+            if len(members[bucket]) > MAX_BUCKET_SIZE:
+                continue
+            for other in members[bucket]:
+                pair = tuple(sorted((value, other)))
+                if other != value and pair not in pairs:
+                    pairs[pair] = similarity(value, other)
+    return {pair: score for pair, score in pairs.items() if score >= min_score}
+
+
+def write_candidates(pairs):
+    """
+    Turns scored name pairs into NameMatchCandidate rows for the scammers carrying
+    them and returns how many were written. Pairs already recorded keep their row.
+    """
+    if not pairs:
+        return 0
+    max_fanout = getattr(settings, 'RELATED_LINK_MAX_FANOUT', 50)
+    carriers = {}
+    rows = ScammerIdentifier.objects.filter(
+        kind='name', value__in={value for pair in pairs for value in pair}
+    ).values_list('value', 'scammer_id')
+    for value, scammer_id in rows:
+        carriers.setdefault(value, set()).add(scammer_id)
+
+    best = {}
+    for (a, b), score in pairs.items():
+        scammers_a, scammers_b = carriers.get(a, set()), carriers.get(b, set())
+        if len(scammers_a) > max_fanout + 1 or len(scammers_b) > max_fanout + 1:
+            continue
+        for x in scammers_a:
+            for y in scammers_b:
+                if x == y:
+                    continue
+                key = (min(x, y), max(x, y))
+                names = (a, b) if x < y else (b, a)
+                if key not in best or best[key][0] < score:
+                    best[key] = (score, *names)
+    if not best:
+        return 0
+
+    scammer_ids = {scammer_id for key in best for scammer_id in key}
+    related = set(
+        Scammer.related_scammers.through.objects.filter(
+            from_scammer_id__in=scammer_ids, to_scammer_id__in=scammer_ids
+        ).values_list('from_scammer_id', 'to_scammer_id')
+    )
+    candidates = NameMatchCandidate.objects.bulk_create([
+        NameMatchCandidate(scammer_id=x, candidate_id=y, name=name, candidate_name=candidate_name, score=round(score, 3))
+        for (x, y), (score, name, candidate_name) in best.items()
+        if (x, y) not in related
+    ], ignore_conflicts=True)
+    return len(candidates)
+
+
+def match_new_names(batch_size=500, min_score=None):
+    """
+    Signs the names that have no signature yet, batch by batch, and records the
+    candidates they produce. Yields (names signed, candidates written) per batch.
+    """
+    if min_score is None:
+        min_score = getattr(settings, 'FUZZY_NAME_MIN_SCORE', 0.5)
+    last_value = ''
+    while True:
+        # Walk the name keys in order so each batch resumes where the last one stopped
+        values = list(unsigned_names().filter(value__gt=last_value)[:batch_size])
+        if not values:
+            return
+        last_value = values[-1]
+        signed = sign(values)
+        yield len(signed), write_candidates(similar_pairs(signed, min_score))
+
+
+def link_candidate(candidate):
+    """
+    Accepts a candidate: relates the two scammers and merges their clusters.
+    """
+    candidate.scammer.related_scammers.add(candidate.candidate_id)
+    clustering.merge(candidate.scammer_id, [candidate.candidate_id])
@@ -0,0 +1,73 @@
+"""
+k-hop neighbourhoods in the related-scammer graph.
+
+The walk is one recursive CTE over the related_scammers through table, so its
+cost does not depend on how many nodes are reached. Only approved scammers are
+followed, and because the relation is symmetrical only one direction of each
+edge has to be joined.
+"""
+from django.db import connection
+from django.db.models import F
+
+from .models import Scammer
+
+DEFAULT_DEPTH = 2
+MAX_DEPTH = 3
+DEFAULT_NODE_LIMIT = 100
+MAX_NODE_LIMIT = 500
+
+NEIGHBOURHOOD_SQL = """
+WITH RECURSIVE walk(scammer_id, depth) AS (
+    SELECT %s, 0
+    UNION
+    SELECT edge.to_scammer_id, walk.depth + 1
+    FROM walk
+    JOIN {through} edge ON edge.from_scammer_id = walk.scammer_id
+    JOIN {scammer} node ON node.id = edge.to_scammer_id
+    WHERE walk.depth < %s AND node.status = 'approved'
+)
+SELECT scammer_id, MIN(depth) AS depth
+FROM walk
+GROUP BY scammer_id
+ORDER BY depth, scammer_id
+LIMIT %s
+"""
+
+
+def walk(scammer_id, depth, limit):
+    """
+    Returns [(scammer id, hops from the start)] for the nearest `limit` scammers
+    within `depth` hops, nearest first. The start scammer is included at depth 0.
+    """
+    sql = NEIGHBOURHOOD_SQL.format(
+        through=connection.ops.quote_name(Scammer.related_scammers.through._meta.db_table),
+        scammer=connection.ops.quote_name(Scammer._meta.db_table),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [scammer_id, depth, limit])
+        return cursor.fetchall()
+
+
+def neighbourhood(scammer_id, depth=DEFAULT_DEPTH, limit=DEFAULT_NODE_LIMIT):
+    """
+    The k-hop neighbourhood of a scammer as {'nodes', 'edges', 'truncated'}, where
+    edges are the [a, b] pairs (a < b) between returned nodes.
+    """
+    # One row more than asked for tells whether the limit cut the walk short
+    rows = walk(scammer_id, depth, limit + 1)
+    truncated = len(rows) > limit
+    rows = rows[:limit]
+    ids = [node_id for node_id, _hops in rows]
+
+    names = dict(Scammer.objects.filter(pk__in=ids).with_first_name().values_list('pk', 'first_name'))
+    edges = (
+        Scammer.related_scammers.through.objects
+        .filter(from_scammer_id__in=ids, to_scammer_id__in=ids, from_scammer_id__lt=F('to_scammer_id'))
+        .order_by('from_scammer_id', 'to_scammer_id')
+        .values_list('from_scammer_id', 'to_scammer_id')
+    )
+    return {
+        'nodes': [{'id': node_id, 'name': names.get(node_id) or '', 'depth': hops} for node_id, hops in rows],
+        'edges': [list(edge) for edge in edges],
+        'truncated': truncated,
+    }
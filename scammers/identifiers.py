@@ -0,0 +1,236 @@
+import re
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db.models import Count
+
+from .models import Scammer, ScammerIdentifier, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerPaymentAccount
+
+# Country code the phone form preselects; numbers typed without one are assumed local.
+DEFAULT_COUNTRY_CODE = '+95'
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+PHONE_RE = re.compile(r'^\+?[\d\s().\-]+$')
+
+
+def join_phone_number(country_code, local_number):
+    """
+    Joins a country code and a local number, dropping the local trunk '0'.
+    This is the rule PhoneNumberField.compress uses when a number is submitted.
+    """
+    return f'{country_code}{local_number.lstrip("0")}'
+
+
+def normalize_phone(value, default_country_code=DEFAULT_COUNTRY_CODE):
+    """
+    Canonicalizes a phone number to E.164 ('+' followed by digits only).
+    Returns None when the value cannot be a phone number.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    digits = re.sub(r'\D', '', value)
+    if not digits:
+        return None
+    if value.startswith('+'):
+        normalized = digits
+    elif digits.startswith('00'):
+        normalized = digits[2:]
+    else:
+        normalized = re.sub(r'\D', '', join_phone_number(default_country_code, digits))
+    # E.164 numbers carry at most 15 digits
+    if not 6 <= len(normalized) <= 15:
+        return None
+    return f'+{normalized}'
+
+
+def normalize_email(value):
+    if not value:
+        return None
+    value = value.strip().lower()
+    if not EMAIL_RE.match(value):
+        return None
+    return value
+
+
+def normalize_domain(value):
+    """
+    Reduces a URL or bare host name to its lowercased host, without 'www.'.
+    """
+    if not value:
+        return None
+    value = value.strip().lower()
+    if '://' not in value:
+        value = f'//{value}'
+    try:
+        host = urlsplit(value).hostname
+    except ValueError:
+        return None
+    if not host or '.' not in host:
+        return None
+    host = host.rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+def normalize_account(value):
+    """
+    Lowercases a payment account and drops spaces and dashes, so
+    "0912 345-678" and "0912345678" share a key.
+    """
+    if not value:
+        return None
+    value = re.sub(r'[\s\-]+', '', value).lower()
+    return value or None
+
+
+def normalize_name(value):
+    """
+    Casefolds a name and collapses its whitespace, so "Aung  Aung" and "aung aung" share a key.
+    """
+    if not value:
+        return None
+    value = ' '.join(value.split()).casefold()
+    return value or None
+
+
+NORMALIZERS = {
+    'phone': normalize_phone,
+    'email': normalize_email,
+    'domain': normalize_domain,
+    'account': normalize_account,
+    'name': normalize_name,
+}
+
+# Kinds accepted by the batch lookup API; names are only used to link related scammers
+LOOKUP_KINDS = ('phone', 'email', 'domain', 'account')
+
+# Identifier kind -> (source model, source field)
+IDENTIFIER_SOURCES = {
+    'phone': (ScammerPhoneNumber, 'phone_number'),
+    'email': (ScammerEmail, 'email'),
+    'domain': (ScammerWebsite, 'website'),
+    'account': (ScammerPaymentAccount, 'account_number'),
+    'name': (ScammerName, 'name'),
+}
+
+# Identifier kind -> the ScammerSerializer field its source rows appear under
+IDENTIFIER_FIELDS = {
+    'phone': 'phone_numbers',
+    'email': 'emails',
+    'domain': 'websites',
+    'account': 'payment_accounts',
+}
+
+
+def normalize_identifier(kind, value):
+    return NORMALIZERS[kind](value)
+
+
+def identifier_kind(query):
+    """
+    Returns the identifier kind a free-text query looks like ('phone' or 'email'),
+    or None when it should be treated as an ordinary text search.
+    """
+    query = query.strip()
+    if EMAIL_RE.match(query):
+        return 'email'
+    if PHONE_RE.match(query) and len(re.sub(r'\D', '', query)) >= 6:
+        return 'phone'
+    return None
+
+
+def is_account_like(query):
+    """
+    True for digit-only input, which may be a payment account number as much as a phone number.
+    """
+    account = normalize_account(query)
+    return bool(account) and account.isdigit()
+
+
+def lookup_scammer_ids(kind, value):
+    """
+    Returns a queryset of scammer ids whose normalized identifier equals the given value.
+    """
+    normalized = normalize_identifier(kind, value)
+    if not normalized:
+        return Scammer.objects.none().values_list('id', flat=True)
+    return ScammerIdentifier.objects.filter(kind=kind, value=normalized).values_list('scammer_id', flat=True)
+
+
+def refresh_identifiers(scammer_id, kind):
+    """
+    Brings the identifier keys of one kind for a scammer in line with its source rows.
+    Returns the set of keys that were newly added.
+    """
+    model, field_name = IDENTIFIER_SOURCES[kind]
+    normalize = NORMALIZERS[kind]
+
+    values = model.objects.filter(scammer_id=scammer_id).values_list(field_name, flat=True)
+    wanted = {normalize(value) for value in values} - {None}
+    existing = set(
+        ScammerIdentifier.objects.filter(scammer_id=scammer_id, kind=kind).values_list('value', flat=True)
+    )
+
+    stale = existing - wanted
+    if stale:
+        ScammerIdentifier.objects.filter(scammer_id=scammer_id, kind=kind, value__in=stale).delete()
+
+    added = wanted - existing
+    if added:
+        ScammerIdentifier.objects.bulk_create(
+            [ScammerIdentifier(scammer_id=scammer_id, kind=kind, value=value) for value in added],
+            ignore_conflicts=True,
+        )
+    return added
+
+
+def link_related_scammers(scammer_id, kind, values):
+    """
+    Links a scammer to every other scammer sharing one of the given normalized keys,
+    writing both directions of each new edge in one bulk insert. Keys shared by more
+    than RELATED_LINK_MAX_FANOUT other scammers (common names, shared bank accounts)
+    are skipped so they cannot join thousands of scammers into one clique.
+    Returns the ids of the scammers linked.
+    """
+    if not values:
+        return set()
+    max_fanout = getattr(settings, 'RELATED_LINK_MAX_FANOUT', 50)
+    others = ScammerIdentifier.objects.filter(kind=kind, value__in=values).exclude(scammer_id=scammer_id)
+
+    linkable = others.values('value').annotate(scammers=Count('scammer_id')).filter(scammers__lte=max_fanout)
+    related_ids = set(
+        others.filter(value__in=linkable.values('value')).values_list('scammer_id', flat=True)
+    )
+    if not related_ids:
+        return related_ids
+
+    through = Scammer.related_scammers.through
+    edges = []
+    for related_id in related_ids:
+        edges.append(through(from_scammer_id=scammer_id, to_scammer_id=related_id))
+        edges.append(through(from_scammer_id=related_id, to_scammer_id=scammer_id))
+    through.objects.bulk_create(edges, ignore_conflicts=True)
+    return related_ids
+
+
+def batch_lookup(identifiers):
+    """
+    Matches (kind, value) pairs against approved scammers with one query per kind.
+    Returns a dict mapping each (kind, normalized value) to the matching scammer ids.
+    """
+    wanted = {}
+    for kind, value in identifiers:
+        normalized = normalize_identifier(kind, value)
+        if normalized:
+            wanted.setdefault(kind, set()).add(normalized)
+
+    matches = {}
+    for kind, values in wanted.items():
+        rows = ScammerIdentifier.objects.filter(
+            kind=kind, value__in=values, scammer__status='approved'
+        ).values_list('value', 'scammer_id')
+        for value, scammer_id in rows:
+            matches.setdefault((kind, value), []).append(scammer_id)
+    return matches
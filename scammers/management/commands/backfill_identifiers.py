@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from scammers.models import ScammerIdentifier
+from scammers.identifiers import IDENTIFIER_SOURCES, NORMALIZERS
+
+class Command(BaseCommand):
+    help = 'Backfills the normalized identifier index from existing name, phone, email, website and payment account rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, help='Number of rows to read and write per batch.', default=2000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+
+        for kind, (model, field_name) in IDENTIFIER_SOURCES.items():
+            self.stdout.write(f'Backfilling {kind} identifiers...')
+            normalize = NORMALIZERS[kind]
+            rows = model.objects.order_by('pk').values_list('scammer_id', field_name).iterator(chunk_size=chunk_size)
+
+            batch = []
+            created = 0
+            for scammer_id, value in rows:
+                normalized = normalize(value)
+                if not normalized:
+                    continue
+                batch.append(ScammerIdentifier(scammer_id=scammer_id, kind=kind, value=normalized))
+                if len(batch) >= chunk_size:
+                    created += len(ScammerIdentifier.objects.bulk_create(batch, ignore_conflicts=True))
+                    batch = []
+            if batch:
+                created += len(ScammerIdentifier.objects.bulk_create(batch, ignore_conflicts=True))
+
+            self.stdout.write(f'Processed {created} {kind} identifiers.')
+
+        self.stdout.write(self.style.SUCCESS('Identifier index backfilled successfully!'))
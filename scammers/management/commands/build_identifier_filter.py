@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from scammers.bloom import publish_full_filter
+
+class Command(BaseCommand):
+    help = 'Publishes a new full Bloom-filter snapshot of the identifiers of approved scammers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, help='Number of identifier rows read per batch.', default=5000)
+
+    def handle(self, *args, **options):
+        self.stdout.write('Building identifier filter...')
+        snapshot = publish_full_filter(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Published filter v{snapshot.version}: {snapshot.item_count} identifiers, '
+            f'{snapshot.bit_count} bits, {snapshot.hash_count} hashes.'
+        ))
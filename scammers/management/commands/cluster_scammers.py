@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from scammers import clustering
+
+class Command(BaseCommand):
+    help = 'Recomputes scammer clusters (connected components over shared identifiers) from the identifier index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, help='Number of rows to read and write per batch.', default=5000)
+
+    def handle(self, *args, **options):
+        self.stdout.write('Clustering scammers...')
+        updated, clustered = clustering.rebuild(chunk_size=options['chunk_size'])
+        clusters = clustering.proposals().count()
+        self.stdout.write(f'{clustered} scammers share identifiers with another scammer; {updated} cluster ids changed.')
+        self.stdout.write(self.style.SUCCESS(f'Scammers clustered successfully! {clusters} clusters are proposed as profiles.'))
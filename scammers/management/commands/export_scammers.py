@@ -0,0 +1,33 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from scammers.export import EXPORT_FORMATS, iter_export, parse_since
+
+class Command(BaseCommand):
+    help = 'Exports approved scammers as NDJSON or CSV, streaming rows in constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, help='Output format.', default='ndjson')
+        parser.add_argument('--since', help='Only export scammers approved at or after this ISO date/datetime.')
+        parser.add_argument('--output', help='File to write to. Defaults to standard output.')
+        parser.add_argument('--chunk-size', type=int, help='Number of scammers fetched per database round trip.', default=500)
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options['since'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        rows = iter_export(options['format'], since=since, chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                count = self._write(rows, output)
+            self.stderr.write(self.style.SUCCESS(f'Exported {count} rows to {options["output"]}.'))
+        else:
+            self._write(rows, sys.stdout)
+
+    def _write(self, rows, output):
+        count = 0
+        for row in rows:
+            output.write(row)
+            count += 1
+        return count
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from scammers import fuzzy_names
+
+class Command(BaseCommand):
+    help = 'Signs new scammer names with MinHash and records near-duplicate name pairs for moderators.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Number of distinct names signed per batch.', default=500)
+        parser.add_argument('--min-score', type=float, help='Minimum trigram similarity (0-1) of a candidate pair.', default=None)
+
+    def handle(self, *args, **options):
+        pruned = fuzzy_names.prune()
+        if pruned:
+            self.stdout.write(f'Removed {pruned} signatures of names no longer in use.')
+
+        self.stdout.write('Matching new names...')
+        signed = written = 0
+        for names, candidates in fuzzy_names.match_new_names(options['batch_size'], options['min_score']):
+            signed += names
+            written += candidates
+            self.stdout.write(f'  {signed} names signed, {written} candidate pairs')
+        self.stdout.write(self.style.SUCCESS(f'Fuzzy name matching finished: {signed} names signed, {written} candidate pairs written.'))
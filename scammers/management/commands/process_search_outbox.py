@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from elasticsearch.exceptions import ConnectionError, TransportError
+from scammers.search_queue import process_batch
+
+class Command(BaseCommand):
+    help = 'Drains the search index outbox, pushing one Elasticsearch bulk request per batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Number of outbox entries per bulk request.', default=500)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox instead of exiting once it is empty.')
+        parser.add_argument('--sleep', type=float, help='Seconds to wait between polls when the outbox is empty or Elasticsearch is unavailable.', default=2.0)
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            try:
+                processed = process_batch(options['batch_size'])
+            except (ConnectionError, TransportError) as e:
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'Elasticsearch unavailable, retrying: {e}')
+                time.sleep(options['sleep'])
+                continue
+
+            total += processed
+            if processed:
+                self.stdout.write(f'Indexed {processed} outbox entries.')
+            elif options['loop']:
+                time.sleep(options['sleep'])
+            else:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'Search outbox drained: {total} entries processed.'))
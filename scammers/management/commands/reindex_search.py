@@ -0,0 +1,46 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django_elasticsearch_dsl.registries import registry
+from elasticsearch_dsl.connections import connections
+from scammers.reindex import reindex, swap_alias
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the search indices without downtime: builds a new versioned index with a process pool, '
+        'then atomically moves the alias over. Stop process_search_outbox while this runs and restart it '
+        'after the swap, so changes queued meanwhile are applied to the new index.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--index', action='append', help='Alias to rebuild (e.g. scammers). Repeatable; defaults to all.')
+        parser.add_argument('--workers', type=int, help='Number of worker processes.', default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, help='Number of documents per bulk request.', default=500)
+        parser.add_argument('--keep-old', action='store_true', help='Keep the previous indices instead of deleting them after the swap.')
+
+    def handle(self, *args, **options):
+        documents = list(registry.get_documents())
+        if options['index']:
+            unknown = set(options['index']) - {doc._index._name for doc in documents}
+            if unknown:
+                raise CommandError(f'Unknown index: {", ".join(sorted(unknown))}')
+            documents = [doc for doc in documents if doc._index._name in options['index']]
+
+        es = connections.get_connection()
+        for doc_class in documents:
+            alias = doc_class._index._name
+            self.stdout.write(f'Rebuilding {alias} with {options["workers"]} workers...')
+            index_name, indexed, failed, seconds = reindex(doc_class, options['workers'], options['chunk_size'], stdout=self.stdout)
+
+            if failed:
+                es.indices.delete(index=index_name)
+                raise CommandError(f'{failed} documents failed to index; {alias} still points to the old index.')
+
+            previous = swap_alias(alias, index_name)
+            rate = indexed / seconds if seconds else indexed
+            self.stdout.write(self.style.SUCCESS(
+                f'{alias} -> {index_name}: {indexed} documents in {seconds:.1f}s ({rate:.0f} docs/sec).'
+            ))
+
+            if previous and not options['keep_old']:
+                es.indices.delete(index=','.join(previous))
+                self.stdout.write(f'Deleted previous indices: {", ".join(previous)}')
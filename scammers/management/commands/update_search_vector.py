@@ -1,20 +1,30 @@
-from django.core.management.base import BaseCommand
-from django.contrib.postgres.search import SearchVector
-from scammers.models import Scammer
+from django.core.management.base import BaseCommand, CommandError
+from scammers.models import Scammer, ScammerProfile
+from scammers import search_vectors
 
 class Command(BaseCommand):
-    help = 'Updates the search_vector for all scammers'
+    help = 'Rebuilds the PostgreSQL search vectors of scammers and profiles in resumable chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=['scammer', 'profile'], help='Only rebuild this model.')
+        parser.add_argument('--chunk-size', type=int, help='Number of rows updated per statement.', default=1000)
+        parser.add_argument('--start-after', type=int, help='Resume after this primary key (as printed by an earlier run).', default=0)
+        parser.add_argument('--missing', action='store_true', help='Only fill rows that have no search vector yet.')
 
     def handle(self, *args, **options):
-        self.stdout.write('Updating search vectors...')
-        Scammer.objects.update(
-            search_vector=(
-                SearchVector('names__name', weight='A') +
-                SearchVector('description', weight='B') +
-                SearchVector('phone_numbers__phone_number', weight='A') +
-                SearchVector('emails__email', weight='A') +
-                SearchVector('websites__website', weight='B') +
-                SearchVector('tags__name', weight='A')
-            )
-        )
-        self.stdout.write(self.style.SUCCESS('Search vectors updated successfully!'))
+        if not search_vectors.is_available():
+            raise CommandError('Search vectors are only used on PostgreSQL.')
+
+        models = {'scammer': Scammer, 'profile': ScammerProfile}
+        if options['model']:
+            models = {options['model']: models[options['model']]}
+
+        for label, model in models.items():
+            self.stdout.write(f'Updating {label} search vectors...')
+            total = 0
+            for count, last_pk in search_vectors.rebuild(
+                model, chunk_size=options['chunk_size'], start_after=options['start_after'], missing_only=options['missing']
+            ):
+                total += count
+                self.stdout.write(f'  {total} {label}s updated (resume with --model {label} --start-after {last_pk})')
+            self.stdout.write(self.style.SUCCESS(f'{total} {label} search vectors updated successfully!'))
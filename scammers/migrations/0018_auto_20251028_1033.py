@@ -2,6 +2,34 @@
 
 from django.db import migrations
 
+
+def create_search_vector_indexes(apps, schema_editor):
+    # GIN indexes over tsvector only exist on PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        '''
+        CREATE INDEX scammers_scammer_search_vector_idx
+        ON scammers_scammer
+        USING GIN (search_vector);
+        '''
+    )
+    schema_editor.execute(
+        '''
+        CREATE INDEX scammers_scammerprofile_search_vector_idx
+        ON scammers_scammerprofile
+        USING GIN (search_vector);
+        '''
+    )
+
+
+def drop_search_vector_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX scammers_scammer_search_vector_idx;')
+    schema_editor.execute('DROP INDEX scammers_scammerprofile_search_vector_idx;')
+
+
 class Migration(migrations.Migration):
 
     dependencies = [
@@ -9,24 +37,5 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.RunSQL(
-            '''
-            CREATE INDEX scammers_scammer_search_vector_idx
-            ON scammers_scammer
-            USING GIN (search_vector);
-            ''',
-            '''
-            DROP INDEX scammers_scammer_search_vector_idx;
-            '''
-        ),
-        migrations.RunSQL(
-            '''
-            CREATE INDEX scammers_scammerprofile_search_vector_idx
-            ON scammers_scammerprofile
-            USING GIN (search_vector);
-            ''',
-            '''
-            DROP INDEX scammers_scammerprofile_search_vector_idx;
-            '''
-        ),
+        migrations.RunPython(create_search_vector_indexes, drop_search_vector_indexes),
     ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scammers', '0018_auto_20251028_1033'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScammerIdentifier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('phone', 'Phone'), ('email', 'Email')], max_length=10)),
+                ('value', models.CharField(max_length=255)),
+                ('scammer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='identifiers', to='scammers.scammer')),
+            ],
+            options={
+                'unique_together': {('kind', 'value', 'scammer')},
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+
+def create_fts_tables(apps, schema_editor):
+    # Full-text tables only back search on SQLite; other databases use Elasticsearch
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        '''
+        CREATE VIRTUAL TABLE scammers_scammer_fts USING fts5(
+            names, phone_numbers, emails, websites, tags, description,
+            tokenize = 'unicode61'
+        );
+        '''
+    )
+    schema_editor.execute(
+        '''
+        CREATE VIRTUAL TABLE scammers_scammerprofile_fts USING fts5(
+            name,
+            tokenize = 'unicode61'
+        );
+        '''
+    )
+    schema_editor.execute(
+        '''
+        INSERT INTO scammers_scammer_fts (rowid, names, phone_numbers, emails, websites, tags, description)
+        SELECT s.id,
+            (SELECT group_concat(name, ' ') FROM scammers_scammername WHERE scammer_id = s.id),
+            (SELECT group_concat(phone_number, ' ') FROM scammers_scammerphonenumber WHERE scammer_id = s.id),
+            (SELECT group_concat(email, ' ') FROM scammers_scammeremail WHERE scammer_id = s.id),
+            (SELECT group_concat(website, ' ') FROM scammers_scammerwebsite WHERE scammer_id = s.id),
+            (SELECT group_concat(t.name, ' ') FROM scammers_tag t
+                JOIN scammers_scammer_tags st ON st.tag_id = t.id WHERE st.scammer_id = s.id),
+            s.description
+        FROM scammers_scammer s;
+        '''
+    )
+    schema_editor.execute(
+        '''
+        INSERT INTO scammers_scammerprofile_fts (rowid, name)
+        SELECT p.id, p.name FROM scammers_scammerprofile p;
+        '''
+    )
+
+
+def drop_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE scammers_scammer_fts;')
+    schema_editor.execute('DROP TABLE scammers_scammerprofile_fts;')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scammers', '0019_scammeridentifier'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_tables, drop_fts_tables),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scammers', '0020_fts_tables'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scammeridentifier',
+            name='kind',
+            field=models.CharField(choices=[('phone', 'Phone'), ('email', 'Email'), ('domain', 'Domain'), ('account', 'Payment Account')], max_length=10),
+        ),
+    ]
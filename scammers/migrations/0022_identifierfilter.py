@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scammers', '0021_scammeridentifier_kind'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdentifierFilter',
+            fields=[
+                ('version', models.BigAutoField(primary_key=True, serialize=False)),
+                ('filter_type', models.CharField(choices=[('full', 'Full'), ('delta', 'Delta')], max_length=5)),
+                ('item_count', models.PositiveIntegerField()),
+                ('bit_count', models.PositiveBigIntegerField()),
+                ('hash_count', models.PositiveSmallIntegerField()),
+                ('data', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scammers', '0025_scammeridentifier_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scammer',
+            name='cluster_id',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
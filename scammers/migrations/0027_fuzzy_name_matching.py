@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scammers', '0026_scammer_cluster_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NameSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NameSignatureBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('signature', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='scammers.namesignature')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NameMatchCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('candidate_name', models.CharField(max_length=255)),
+                ('score', models.FloatField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('linked', 'Linked'), ('dismissed', 'Dismissed')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='scammers.scammer')),
+                ('scammer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_match_candidates', to='scammers.scammer')),
+            ],
+            options={
+                'unique_together': {('scammer', 'candidate')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scammers', '0027_fuzzy_name_matching'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchindexoutbox',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
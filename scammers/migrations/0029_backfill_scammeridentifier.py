@@ -0,0 +1,106 @@
+import re
+from urllib.parse import urlsplit
+
+from django.db import migrations
+
+CHUNK_SIZE = 2000
+
+# The normalizers of scammers/identifiers.py as of this migration, frozen so later
+# changes there do not alter what it writes. `manage.py backfill_identifiers` uses the
+# current ones.
+DEFAULT_COUNTRY_CODE = '+95'
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def normalize_phone(value):
+    if not value:
+        return None
+    value = value.strip()
+    digits = re.sub(r'\D', '', value)
+    if not digits:
+        return None
+    if value.startswith('+'):
+        normalized = digits
+    elif digits.startswith('00'):
+        normalized = digits[2:]
+    else:
+        normalized = re.sub(r'\D', '', DEFAULT_COUNTRY_CODE + digits.lstrip('0'))
+    if not 6 <= len(normalized) <= 15:
+        return None
+    return f'+{normalized}'
+
+
+def normalize_email(value):
+    if not value:
+        return None
+    value = value.strip().lower()
+    return value if EMAIL_RE.match(value) else None
+
+
+def normalize_domain(value):
+    if not value:
+        return None
+    value = value.strip().lower()
+    if '://' not in value:
+        value = f'//{value}'
+    try:
+        host = urlsplit(value).hostname
+    except ValueError:
+        return None
+    if not host or '.' not in host:
+        return None
+    host = host.rstrip('.')
+    return host[4:] if host.startswith('www.') else host
+
+
+def normalize_account(value):
+    if not value:
+        return None
+    return re.sub(r'[\s\-]+', '', value).lower() or None
+
+
+def normalize_name(value):
+    if not value:
+        return None
+    return ' '.join(value.split()).casefold() or None
+
+
+# Identifier kind -> (source model, source field, normalizer)
+SOURCES = {
+    'phone': ('ScammerPhoneNumber', 'phone_number', normalize_phone),
+    'email': ('ScammerEmail', 'email', normalize_email),
+    'domain': ('ScammerWebsite', 'website', normalize_domain),
+    'account': ('ScammerPaymentAccount', 'account_number', normalize_account),
+    'name': ('ScammerName', 'name', normalize_name),
+}
+
+
+def backfill_identifiers(apps, schema_editor):
+    # Rows written before the identifier index existed have no keys; saves since then keep it current
+    ScammerIdentifier = apps.get_model('scammers', 'ScammerIdentifier')
+    for kind, (model_name, field_name, normalize) in SOURCES.items():
+        source = apps.get_model('scammers', model_name)
+        rows = source.objects.order_by('pk').values_list('scammer_id', field_name).iterator(chunk_size=CHUNK_SIZE)
+
+        batch = []
+        for scammer_id, value in rows:
+            normalized = normalize(value)
+            if not normalized:
+                continue
+            batch.append(ScammerIdentifier(scammer_id=scammer_id, kind=kind, value=normalized))
+            if len(batch) >= CHUNK_SIZE:
+                ScammerIdentifier.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            ScammerIdentifier.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scammers', '0028_searchindexoutbox_attempts'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_identifiers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+# The scammer FTS table as of 0020, without payment accounts
+COLUMNS_0020 = ['names', 'phone_numbers', 'emails', 'websites', 'tags', 'description']
+COLUMNS = ['names', 'phone_numbers', 'emails', 'websites', 'payment_accounts', 'tags', 'description']
+
+COLUMN_SOURCES = {
+    'names': "(SELECT group_concat(name, ' ') FROM scammers_scammername WHERE scammer_id = s.id)",
+    'phone_numbers': "(SELECT group_concat(phone_number, ' ') FROM scammers_scammerphonenumber WHERE scammer_id = s.id)",
+    'emails': "(SELECT group_concat(email, ' ') FROM scammers_scammeremail WHERE scammer_id = s.id)",
+    'websites': "(SELECT group_concat(website, ' ') FROM scammers_scammerwebsite WHERE scammer_id = s.id)",
+    'payment_accounts': "(SELECT group_concat(account_number, ' ') FROM scammers_scammerpaymentaccount WHERE scammer_id = s.id)",
+    'tags': (
+        "(SELECT group_concat(t.name, ' ') FROM scammers_tag t "
+        "JOIN scammers_scammer_tags st ON st.tag_id = t.id WHERE st.scammer_id = s.id)"
+    ),
+    'description': 's.description',
+}
+
+
+def rebuild_scammer_fts(schema_editor, columns):
+    # FTS5 tables cannot add columns, so the table is recreated and refilled
+    schema_editor.execute('DROP TABLE scammers_scammer_fts;')
+    schema_editor.execute(
+        f'''
+        CREATE VIRTUAL TABLE scammers_scammer_fts USING fts5(
+            {', '.join(columns)},
+            tokenize = 'unicode61'
+        );
+        '''
+    )
+    schema_editor.execute(
+        f'''
+        INSERT INTO scammers_scammer_fts (rowid, {', '.join(columns)})
+        SELECT s.id, {', '.join(COLUMN_SOURCES[column] for column in columns)}
+        FROM scammers_scammer s;
+        '''
+    )
+
+
+def add_payment_accounts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    rebuild_scammer_fts(schema_editor, COLUMNS)
+
+
+def remove_payment_accounts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    rebuild_scammer_fts(schema_editor, COLUMNS_0020)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scammers', '0029_backfill_scammeridentifier'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_payment_accounts, remove_payment_accounts),
+    ]
@@ -1,7 +1,18 @@
 from django.db import models
+from django.db.models import OuterRef, Subquery
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import get_language
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+
+class ScammerQuerySet(models.QuerySet):
+    def with_first_name(self):
+        """
+        Annotates `first_name`, the scammer's earliest name (None without names),
+        so lists can show a name without loading every scammer's names.
+        """
+        first_name = ScammerName.objects.filter(scammer=OuterRef('pk')).order_by('pk').values('name')[:1]
+        return self.annotate(first_name=Subquery(first_name))
 
 class Scammer(models.Model):
     STATUS_CHOICES = [
@@ -15,41 +26,46 @@ class Scammer(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     tags = models.ManyToManyField('Tag', blank=True)
     related_scammers = models.ManyToManyField('self', blank=True)
+    # Smallest scammer id of the connected component over shared identifiers (scammers/clustering.py)
+    cluster_id = models.PositiveIntegerField(null=True, blank=True, editable=False, db_index=True)
+    # PostgreSQL full-text document, read by PostgresSearchBackend
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ScammerQuerySet.as_manager()
 
     def __str__(self):
         first_name = self.names.first()
         return first_name.name if first_name else f"Scammer #{self.pk}"
 
+    # (identifier kind, label) of the data points two scammers can share
+    RELATIONSHIP_KINDS = [
+        ('phone', _('Phone')),
+        ('email', _('Email')),
+        ('name', _('Name')),
+        ('account', _('Account')),
+    ]
+
     def get_relationship_reasons(self, other_scammer):
-        reasons = []
-        # Compare phone numbers (case-insensitive)
-        self_phones = set(p.lower() for p in self.phone_numbers.values_list('phone_number', flat=True) if p)
-        other_phones = set(p.lower() for p in other_scammer.phone_numbers.values_list('phone_number', flat=True) if p)
-        common_phones = self_phones.intersection(other_phones)
-        for phone in common_phones:
-            reasons.append(f"{_('Phone')}: {phone}")
-
-        # Compare emails (case-insensitive)
-        self_emails = set(e.lower() for e in self.emails.values_list('email', flat=True) if e)
-        other_emails = set(e.lower() for e in other_scammer.emails.values_list('email', flat=True) if e)
-        common_emails = self_emails.intersection(other_emails)
-        for email in common_emails:
-            reasons.append(f"{_('Email')}: {email}")
-
-        # Compare names (case-insensitive)
-        self_names = set(n.lower() for n in self.names.values_list('name', flat=True) if n)
-        other_names = set(n.lower() for n in other_scammer.names.values_list('name', flat=True) if n)
-        common_names = self_names.intersection(other_names)
-        for name in common_names:
-            reasons.append(f"{_('Name')}: {name}")
-
-        # Compare payment accounts (case-insensitive)
-        self_accounts = set(a.lower() for a in self.payment_accounts.values_list('account_number', flat=True) if a)
-        other_accounts = set(a.lower() for a in other_scammer.payment_accounts.values_list('account_number', flat=True) if a)
-        common_accounts = self_accounts.intersection(other_accounts)
-        for account in common_accounts:
-            reasons.append(f"{_('Account')}: {account}")
-            
+        return self.get_relationship_reasons_map([other_scammer.pk])[other_scammer.pk]
+
+    def get_relationship_reasons_map(self, scammer_ids):
+        """
+        Returns {scammer id: [reasons]} for the normalized identifier keys each of the
+        given scammers shares with this one, using one query per identifier kind. These
+        are the keys related scammers are linked on (scammers/identifiers.py).
+        """
+        reasons = {scammer_id: [] for scammer_id in scammer_ids}
+        if not reasons:
+            return reasons
+        for kind, label in self.RELATIONSHIP_KINDS:
+            own_values = ScammerIdentifier.objects.filter(scammer_id=self.pk, kind=kind).values('value')
+            shared = (
+                ScammerIdentifier.objects.filter(scammer_id__in=reasons, kind=kind, value__in=own_values)
+                .values_list('scammer_id', 'value')
+                .order_by('scammer_id', 'value')
+            )
+            for scammer_id, value in shared:
+                reasons[scammer_id].append(f"{label}: {value}")
         return reasons
 
 class ScammerName(models.Model):
@@ -152,6 +168,122 @@ class ScammerPaymentAccount(models.Model):
             return '*' * (len(self.account_number) - 4) + self.account_number[-4:]
         return '*' * len(self.account_number)
 
+class ScammerIdentifier(models.Model):
+    """
+    Normalized identifier keys of a scammer, maintained on write by the signals
+    in scammers/signals.py so exact lookups are a single indexed equality match.
+    """
+    KIND_CHOICES = [
+        ('phone', 'Phone'),
+        ('email', 'Email'),
+        ('domain', 'Domain'),
+        ('account', 'Payment Account'),
+        ('name', 'Name'),
+    ]
+    scammer = models.ForeignKey(Scammer, related_name='identifiers', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    value = models.CharField(max_length=255)
+
+    class Meta:
+        unique_together = ('kind', 'value', 'scammer')
+
+    def __str__(self):
+        return f"{self.kind}: {self.value}"
+
+class IdentifierFilter(models.Model):
+    """
+    A published Bloom filter over approved identifiers (see scammers/bloom.py).
+    A 'full' filter covers everything; a 'delta' covers keys added after the previous version.
+    """
+    FULL = 'full'
+    DELTA = 'delta'
+    FILTER_TYPE_CHOICES = [
+        (FULL, 'Full'),
+        (DELTA, 'Delta'),
+    ]
+    version = models.BigAutoField(primary_key=True)
+    filter_type = models.CharField(max_length=5, choices=FILTER_TYPE_CHOICES)
+    item_count = models.PositiveIntegerField()
+    bit_count = models.PositiveBigIntegerField()
+    hash_count = models.PositiveSmallIntegerField()
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.get_filter_type_display()} filter v{self.version}"
+
+class ResourceVersion(models.Model):
+    """
+    A change counter per public resource ('scammers', 'profiles'), bumped by the signals
+    in scammers/signals.py and used to answer conditional GETs (see scammers/versioning.py).
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+class SearchIndexOutbox(models.Model):
+    """
+    An object whose search documents need re-indexing, written by the signal processor
+    in scammers/search_queue.py and drained by the process_search_outbox command.
+    Entries whose indexing failed stay for retry and count their attempts.
+    """
+    model_label = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model_label} #{self.object_id}"
+
+class NameSignature(models.Model):
+    """
+    MinHash signature of one normalized name, as indexed under the 'name' kind of
+    ScammerIdentifier. Written by the match_fuzzy_names command (scammers/fuzzy_names.py).
+    """
+    value = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.value
+
+class NameSignatureBucket(models.Model):
+    """
+    One LSH band of a name signature. Names sharing a bucket in any band are compared.
+    """
+    signature = models.ForeignKey(NameSignature, related_name='buckets', on_delete=models.CASCADE)
+    bucket = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"{self.signature.value}: {self.bucket}"
+
+class NameMatchCandidate(models.Model):
+    """
+    Two scammers whose names are near-duplicates, scored by the fuzzy name matcher
+    and waiting for a moderator to link or dismiss them. `scammer` has the smaller id.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('linked', 'Linked'),
+        ('dismissed', 'Dismissed'),
+    ]
+    scammer = models.ForeignKey(Scammer, related_name='name_match_candidates', on_delete=models.CASCADE)
+    candidate = models.ForeignKey(Scammer, related_name='+', on_delete=models.CASCADE)
+    name = models.CharField(max_length=255)
+    candidate_name = models.CharField(max_length=255)
+    score = models.FloatField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('scammer', 'candidate')
+
+    def __str__(self):
+        return f"{self.name} ~ {self.candidate_name} ({self.score:.2f})"
+
 class ScammerCustomField(models.Model):
     scammer = models.ForeignKey(Scammer, related_name='custom_fields', on_delete=models.CASCADE)
     field_label = models.CharField(max_length=255)
@@ -192,6 +324,9 @@ class ScammerProfile(models.Model):
     name = models.CharField(max_length=255)
     image = models.ImageField(upload_to='profile_images/', blank=True, null=True)
     cases = models.ManyToManyField(Scammer, related_name='profiles')
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ScammerQuerySet.as_manager()
 
     def __str__(self):
         return self.name
@@ -0,0 +1,114 @@
+"""
+Paginator for elasticsearch-dsl searches that pages inside Elasticsearch instead
+of loading ids into the database.
+
+Pages within the index's result window are fetched with from/size. Deeper pages
+use search_after, either from the token carried by the previous page's "next"
+link or by seeking forward on sort values only. The page count comes from
+hits.total of the page request itself, so no separate count is needed.
+"""
+import base64
+import binascii
+import json
+
+from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+
+# Elasticsearch's default index.max_result_window
+MAX_RESULT_WINDOW = 10000
+SEEK_CHUNK_SIZE = 1000
+
+
+def encode_after(number, sort_values):
+    """
+    Encodes the sort values of the last hit before page `number` as an opaque token.
+    """
+    raw = json.dumps([number, sort_values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_after(token):
+    """
+    Decodes a token made by encode_after into (number, sort_values), or (None, None).
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        number, sort_values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        return None, None
+    if not isinstance(number, int) or not isinstance(sort_values, list):
+        return None, None
+    return number, sort_values
+
+
+class SearchPaginator(Paginator):
+    """
+    A Paginator over an elasticsearch-dsl Search. The search must have a
+    deterministic sort (ending in a unique tiebreaker) for search_after to work.
+    Pages hold the raw hits; `page.next_after` is the token for the next page.
+    """
+
+    def __init__(self, search, per_page, after=None, **kwargs):
+        super().__init__(search.extra(track_total_hits=True), per_page, **kwargs)
+        self.after = after
+
+    @property
+    def count(self):
+        if 'total' not in self.__dict__:
+            # Only reached when the count is needed before any page was fetched
+            self.total = self.object_list.extra(size=0).execute().hits.total.value
+        return self.total
+
+    def get_page(self, number):
+        # Paginator.get_page validates against the count first, which would cost an extra request
+        try:
+            return self.page(number)
+        except PageNotAnInteger:
+            return self.page(1)
+        except EmptyPage:
+            return self.page(self.num_pages)
+
+    def page(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+
+        bottom = (number - 1) * self.per_page
+        response = self._fetch(number, bottom)
+        self.total = response.hits.total.value
+        number = self.validate_number(number)
+
+        hits = list(response)
+        page = self._get_page(hits, number, self)
+        page.next_after = encode_after(number + 1, list(hits[-1].meta.sort)) if hits and page.has_next() else None
+        return page
+
+    def _fetch(self, number, bottom):
+        if bottom + self.per_page <= MAX_RESULT_WINDOW:
+            return self.object_list[bottom:bottom + self.per_page].execute()
+        search_after = self._seek(number, bottom)
+        if search_after is None:
+            return self.object_list.extra(size=0).execute()
+        return self.object_list.extra(size=self.per_page, search_after=search_after).execute()
+
+    def _seek(self, number, bottom):
+        """
+        Returns the sort values of the hit just before `bottom`.
+        """
+        token_number, sort_values = decode_after(self.after) if self.after else (None, None)
+        if token_number == number:
+            return sort_values
+
+        # Jump to the deepest from/size position, then walk forward on sort values only
+        s = self.object_list.source(False)
+        position = min(bottom, MAX_RESULT_WINDOW)
+        hits = s[position - 1:position].execute().hits
+        if bottom >= hits.total.value:
+            return None
+        while hits and position < bottom:
+            size = min(SEEK_CHUNK_SIZE, bottom - position)
+            hits = s.extra(size=size, search_after=list(hits[-1].meta.sort)).execute().hits
+            position += len(hits)
+        return list(hits[-1].meta.sort) if hits and position == bottom else None
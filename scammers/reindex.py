@@ -0,0 +1,114 @@
+"""
+Zero-downtime rebuild of the search indices. Each document is indexed into a new
+timestamped index by a pool of worker processes, each covering a slice of the
+primary-key space, and the document's index name is then atomically moved over
+to it as an alias. Searches keep hitting the old index until the swap.
+"""
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import django
+from django.db import connections
+from django.db.models import Min, Max
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from elasticsearch import NotFoundError
+from elasticsearch_dsl.connections import connections as es_connections
+
+# Number of pk ranges handed out per worker, so a slow range does not stall the pool
+RANGES_PER_WORKER = 4
+
+
+def document_path(doc_class):
+    return f'{doc_class.__module__}.{doc_class.__name__}'
+
+
+def pk_ranges(queryset, workers, chunk_size):
+    """
+    Splits the primary-key space of the queryset into half-open [start, end) ranges.
+    """
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    span = bounds['high'] - bounds['low'] + 1
+    step = max(chunk_size, math.ceil(span / (workers * RANGES_PER_WORKER)))
+    return [(start, min(start + step, bounds['high'] + 1)) for start in range(bounds['low'], bounds['high'] + 1, step)]
+
+
+def _init_worker():
+    django.setup()
+
+
+def index_range(doc_path, index_name, start, end, chunk_size):
+    """
+    Indexes the objects with start <= pk < end into index_name.
+    Runs in a worker process; returns (indexed, failed).
+    """
+    doc = import_string(doc_path)()
+    queryset = doc.get_queryset().filter(pk__gte=start, pk__lt=end).order_by('pk')
+
+    def actions():
+        for action in doc.get_actions(queryset.iterator(chunk_size=chunk_size), 'index'):
+            action['_index'] = index_name
+            yield action
+
+    return doc.bulk(actions(), chunk_size=chunk_size, stats_only=True, raise_on_error=False)
+
+
+def create_index(doc_class, index_name):
+    # Refreshing while bulk loading only slows it down; it is switched back on before the swap
+    index = doc_class._index.clone(name=index_name)
+    index.settings(refresh_interval='-1')
+    index.create()
+    return index
+
+
+def swap_alias(alias, index_name):
+    """
+    Points the alias at index_name in a single update_aliases call and returns the
+    indices it was taken from. An existing concrete index named like the alias (as
+    left by search_index --rebuild) is removed in the same call.
+    """
+    es = es_connections.get_connection()
+    try:
+        previous = list(es.indices.get_alias(name=alias))
+        actions = [{'remove': {'index': index, 'alias': alias}} for index in previous]
+    except NotFoundError:
+        previous = []
+        actions = []
+        if es.indices.exists(index=alias):
+            actions.append({'remove_index': {'index': alias}})
+    actions.append({'add': {'index': index_name, 'alias': alias}})
+    es.indices.update_aliases(actions=actions)
+    return previous
+
+
+def reindex(doc_class, workers, chunk_size, stdout=None):
+    """
+    Builds a new index for doc_class with a process pool and returns
+    (index_name, indexed, failed, seconds). The alias is not touched.
+    """
+    alias = doc_class._index._name
+    index_name = f"{alias}-{timezone.now().strftime('%Y%m%d%H%M%S')}"
+    index = create_index(doc_class, index_name)
+
+    ranges = pk_ranges(doc_class().get_queryset(), workers, chunk_size)
+    indexed = failed = 0
+    started = time.monotonic()
+
+    # Workers open their own connections; the parent's would only sit idle for the whole build
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'), initializer=_init_worker) as pool:
+        futures = [pool.submit(index_range, document_path(doc_class), index_name, start, end, chunk_size) for start, end in ranges]
+        for future in as_completed(futures):
+            ok, errors = future.result()
+            indexed += ok
+            failed += errors
+            if stdout is not None:
+                stdout.write(f'  {index_name}: {indexed} documents indexed')
+
+    index.put_settings(body={'index': {'refresh_interval': None}})
+    index.refresh()
+    return index_name, indexed, failed, time.monotonic() - started
@@ -0,0 +1,441 @@
+"""
+Search backends behind scammer_list, ScammerProfileListView and the API SearchView.
+
+settings.SEARCH_BACKEND names the class to use, so each deployment can pick its
+fastest engine: Elasticsearch, PostgreSQL full-text search over search_vector,
+SQLite FTS5 (scammers/fts.py), or plain ORM lookups that work anywhere.
+"""
+import functools
+import logging
+import re
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.paginator import Paginator
+from django.db.models import Q, F, Case, When, Value, IntegerField, FloatField, Exists, OuterRef, prefetch_related_objects
+from django.db.models.functions import Cast
+from django.utils.module_loading import import_string
+from elasticsearch import ApiError, TransportError
+from elasticsearch_dsl.query import Q as ES_Q
+
+from . import fts
+from .documents import ScammerDocument, ScammerProfileDocument, SCAMMER_CARD_FIELDS
+from .identifiers import identifier_kind, normalize_phone, normalize_email, lookup_scammer_ids, is_account_like
+from .models import (
+    Scammer, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerPaymentAccount, Tag, ScammerProfile
+)
+from .pagination import SearchPaginator
+from .search_breaker import CircuitBreaker, CLOSED
+
+logger = logging.getLogger(__name__)
+
+# Elasticsearch connection alias with the tight timeouts meant for interactive searches
+SEARCH_CONNECTION = 'search'
+
+# Relevance of an ORM search hit by the field it matched; lower ranks are listed first
+RANK_IDENTIFIER = 0
+RANK_NAME = 1
+RANK_TAG = 2
+RANK_DESCRIPTION = 3
+
+
+# Set when a fallback backend answers a search in the current context (see tracking_fallbacks)
+_fallback_served = ContextVar('search_fallback_served', default=False)
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_search_backend():
+    return _load_backend(settings.SEARCH_BACKEND)
+
+
+def scammer_card_from_hit(hit):
+    return {
+        'pk': hit.meta.id,
+        'name': hit.display_name,
+        'created_at': hit.created_at,
+        'description': hit.description,
+        'tags': [tag.name for tag in hit.tags],
+    }
+
+
+def scammer_card_from_model(scammer):
+    names = sorted(scammer.names.all(), key=lambda name: name.pk)
+    return {
+        'pk': scammer.pk,
+        'name': names[0].name if names else None,
+        'created_at': scammer.created_at,
+        'description': scammer.description,
+        'tags': [tag.name for tag in scammer.tags.all()],
+    }
+
+
+def latest_approved_scammers():
+    return Scammer.objects.filter(status='approved').order_by('-approved_at', '-id')
+
+
+class BaseSearchBackend:
+    """
+    Backends implement scammer_results, scammer_ids and profile_results. Queries
+    only ever match approved scammers.
+    """
+
+    def scammer_results(self, query, search_field='all'):
+        """
+        Returns a sliceable sequence of the matching scammers, best match first.
+        """
+        raise NotImplementedError
+
+    def scammer_ids(self, query, search_field='all', after=None, limit=20):
+        """
+        Returns one page of matching scammer ids and the position to continue
+        after (a JSON-serializable list), or None on the last page.
+
+        Positions start with the name of the backend that issued them. Each backend
+        orders and encodes positions its own way, so a position issued by another
+        backend (as when Elasticsearch and its fallback take turns) restarts at the
+        first page instead of being misread.
+        """
+        tag = type(self).__name__
+        after = after[1:] if after and after[0] == tag else None
+        ids, next_position = self.ranked_ids(query, search_field, after, limit)
+        return ids, [tag, *next_position] if next_position else None
+
+    def ranked_ids(self, query, search_field, after, limit):
+        """
+        Implements scammer_ids for positions without the backend tag.
+        Raises ValueError for a position this backend did not produce.
+        """
+        raise NotImplementedError
+
+    def profile_results(self, query):
+        raise NotImplementedError
+
+    def complete_names(self, prefix, limit=10):
+        """
+        Returns up to `limit` distinct names of approved scammers starting with the prefix.
+        """
+        return list(
+            ScammerName.objects.filter(name__istartswith=prefix, scammer__status='approved')
+            .order_by('name').values_list('name', flat=True).distinct()[:limit]
+        )
+
+    def is_degraded(self):
+        """
+        True while searches are served by a fallback rather than this backend.
+        """
+        return False
+
+    def health(self):
+        return {'backend': type(self).__name__, 'degraded': self.is_degraded()}
+
+    def scammer_page(self, query, search_field, number, per_page, after=None):
+        """
+        Returns the Page of scammer_list cards for the given page number.
+        """
+        results = self.scammer_results(query, search_field) if query.strip() else latest_approved_scammers()
+        page = Paginator(results, per_page).get_page(number)
+        scammers = list(page.object_list)
+        prefetch_related_objects(scammers, 'names', 'tags')
+        page.object_list = [scammer_card_from_model(scammer) for scammer in scammers]
+        return page
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Substring matching with the ORM. Needs no extra infrastructure; complete phone
+    numbers and emails are answered from the normalized identifier index.
+    """
+
+    # search_field -> (related model, lookup)
+    field_lookups = {
+        'name': (ScammerName, 'name__icontains'),
+        'phone': (ScammerPhoneNumber, 'phone_number__icontains'),
+        'email': (ScammerEmail, 'email__icontains'),
+        'website': (ScammerWebsite, 'website__icontains'),
+    }
+
+    def _related(self, model, lookup, query):
+        return Exists(model.objects.filter(scammer=OuterRef('pk'), **{lookup: query}))
+
+    def _tag_match(self, query):
+        return Exists(Tag.objects.filter(scammer=OuterRef('pk'), name__icontains=query))
+
+    def _identifier_match(self, query, search_field):
+        condition = Q(id__in=lookup_scammer_ids(search_field, query))
+        if search_field == 'phone' and is_account_like(query):
+            condition |= Q(id__in=lookup_scammer_ids('account', query))
+        return condition
+
+    def ranked_queryset(self, query, search_field='all'):
+        """
+        Annotates every matching approved scammer with the rank of its best matching field.
+        In phone mode, digit-only queries also match payment account numbers.
+        """
+        approved = Scammer.objects.filter(status='approved')
+        if search_field in ('phone', 'email') and identifier_kind(query) == search_field:
+            # Complete phone numbers and emails are answered from the normalized identifier index
+            exact = approved.filter(self._identifier_match(query, search_field))
+            if exact.exists():
+                return exact.annotate(rank=Value(RANK_IDENTIFIER, output_field=IntegerField()))
+            # No stored key equals the query (a partial number, say): search substrings instead
+        if search_field in self.field_lookups:
+            match = self._related(*self.field_lookups[search_field], query)
+            if search_field == 'phone' and is_account_like(query):
+                match |= self._related(ScammerPaymentAccount, 'account_number__icontains', query)
+            return approved.filter(match).annotate(rank=Value(RANK_NAME, output_field=IntegerField()))
+        if search_field == 'tag':
+            return approved.filter(self._tag_match(query)).annotate(rank=Value(RANK_TAG, output_field=IntegerField()))
+
+        identifier_match = (
+            self._related(ScammerPhoneNumber, 'phone_number__icontains', query) |
+            self._related(ScammerEmail, 'email__icontains', query) |
+            self._related(ScammerWebsite, 'website__icontains', query) |
+            self._related(ScammerPaymentAccount, 'account_number__icontains', query)
+        )
+        return approved.annotate(
+            rank=Case(
+                When(identifier_match, then=Value(RANK_IDENTIFIER)),
+                When(self._related(ScammerName, 'name__icontains', query), then=Value(RANK_NAME)),
+                When(self._tag_match(query), then=Value(RANK_TAG)),
+                When(description__icontains=query, then=Value(RANK_DESCRIPTION)),
+                default=None,
+                output_field=IntegerField(),
+            )
+        ).filter(rank__isnull=False)
+
+    def scammer_results(self, query, search_field='all'):
+        return self.ranked_queryset(query, search_field).order_by('rank', '-id')
+
+    def ranked_ids(self, query, search_field, after, limit):
+        queryset = self.ranked_queryset(query, search_field)
+        if after:
+            rank, last_id = (int(value) for value in after)
+            queryset = queryset.filter(Q(rank__gt=rank) | Q(rank=rank, id__lt=last_id))
+        page = list(queryset.order_by('rank', '-id').values_list('rank', 'id')[:limit + 1])
+        next_position = list(page[limit - 1]) if len(page) > limit else None
+        return [scammer_id for rank, scammer_id in page[:limit]], next_position
+
+    def profile_results(self, query):
+        return ScammerProfile.objects.filter(name__icontains=query).order_by('pk')
+
+
+class SQLiteFTSSearchBackend(DatabaseSearchBackend):
+    """
+    BM25-ranked SQLite FTS5 search. On other databases fts falls back to ORM scans.
+    Phone and email modes use the identifier index of the parent class.
+    """
+    identifier_modes = ('phone', 'email')
+
+    def scammer_results(self, query, search_field='all'):
+        if search_field in self.identifier_modes:
+            return super().scammer_results(query, search_field)
+        return fts.search_scammers(query, search_field)
+
+    def ranked_ids(self, query, search_field, after, limit):
+        if search_field in self.identifier_modes:
+            return super().ranked_ids(query, search_field, after, limit)
+        # Offset paging inside FTS5, so deep pages are not cut off at fts.MAX_RESULTS
+        offset = int(after[0]) if after else 0
+        if offset < 0:
+            raise ValueError('Negative offset')
+        ids = fts.search_scammer_ids(query, search_field, offset=offset, limit=limit + 1)
+        next_position = [offset + limit] if len(ids) > limit else None
+        return ids[:limit], next_position
+
+    def profile_results(self, query):
+        return fts.search_profiles(query)
+
+
+class PostgresSearchBackend(DatabaseSearchBackend):
+    """
+    PostgreSQL full-text search over the GIN-indexed search_vector columns, ranked
+    with SearchRank. Single-field modes use the ORM lookups of the parent class.
+    """
+
+    def _search_query(self, query):
+        return SearchQuery(query, search_type='websearch')
+
+    def ranked_queryset(self, query, search_field='all'):
+        if search_field != 'all':
+            return super().ranked_queryset(query, search_field)
+        search_query = self._search_query(query)
+        # ts_rank is a real; as double precision it survives the float/JSON round trip
+        # of the cursor exactly, so the keyset comparison below is reliable
+        return Scammer.objects.filter(status='approved', search_vector=search_query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), search_query), FloatField())
+        )
+
+    def scammer_results(self, query, search_field='all'):
+        if search_field != 'all':
+            return super().scammer_results(query, search_field)
+        return self.ranked_queryset(query).order_by('-rank', '-id')
+
+    def ranked_ids(self, query, search_field, after, limit):
+        if search_field != 'all':
+            return super().ranked_ids(query, search_field, after, limit)
+        queryset = self.ranked_queryset(query)
+        if after:
+            rank, last_id = float(after[0]), int(after[1])
+            queryset = queryset.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=last_id))
+        page = list(queryset.order_by('-rank', '-id').values_list('rank', 'id')[:limit + 1])
+        next_position = list(page[limit - 1]) if len(page) > limit else None
+        return [scammer_id for rank, scammer_id in page[:limit]], next_position
+
+    def profile_results(self, query):
+        search_query = self._search_query(query)
+        return ScammerProfile.objects.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', '-pk')
+
+
+def phone_filter(query):
+    """
+    Exact or leading-digits match on the normalized phone subfields.
+    Local numbers are read with the default country code, as on submission.
+    """
+    normalized = normalize_phone(query)
+    digits = normalized[1:] if normalized else re.sub(r'\D', '', query)
+    return ES_Q("bool", should=[
+        ES_Q("term", **{"phone_numbers.e164": digits}),
+        ES_Q("term", **{"phone_numbers.e164.prefix": digits}),
+    ], minimum_should_match=1)
+
+
+def email_filter(query):
+    email = normalize_email(query)
+    if email:
+        return ES_Q("term", **{"emails.email.keyword": email})
+    return ES_Q("prefix", **{"emails.email.keyword": query.strip().lower()})
+
+
+def scammer_search(query, search_field='all'):
+    """
+    Builds the Elasticsearch query for a scammer search. Without a query the
+    newest approved cases come first.
+    """
+    s = ScammerDocument.search(using=SEARCH_CONNECTION).filter('term', status='approved')
+    if not query:
+        return s.sort('-approved_at', '-id')
+    s = s.sort('_score', '-id')
+    if search_field == 'name':
+        return s.query("nested", path="names", query=ES_Q("match", **{"names.name": {"query": query, "analyzer": "edge_ngram_analyzer"}}))
+    if search_field == 'phone':
+        match = ES_Q("nested", path="phone_numbers", query=phone_filter(query))
+        if is_account_like(query):
+            match |= ES_Q("nested", path="payment_accounts", query=ES_Q("match", **{"payment_accounts.account_number": query}))
+        return s.filter(match)
+    if search_field == 'email':
+        return s.filter("nested", path="emails", query=email_filter(query))
+    if search_field == 'website':
+        return s.query("nested", path="websites", query=ES_Q("match", websites__website=query))
+    if search_field == 'tag':
+        return s.query("nested", path="tags", query=ES_Q("match", tags__name=query))
+    # 'all': one flattened field instead of a nested query per relation
+    return s.query("multi_match", query=query, fields=["all_identifiers^2", "description"])
+
+
+def tracking_fallbacks(build):
+    """
+    Runs build() and returns (its result, whether a fallback backend answered any
+    search in it), so results produced during an outage can be told apart.
+    """
+    token = _fallback_served.set(False)
+    try:
+        return build(), _fallback_served.get()
+    finally:
+        _fallback_served.reset(token)
+
+
+def with_fallback(method):
+    """
+    Runs a search through the circuit breaker, answering from the fallback backend
+    while the breaker is open or when Elasticsearch fails.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.breaker.count('requests')
+        if self.breaker.allow_request():
+            try:
+                result = method(self, *args, **kwargs)
+            except (ApiError, TransportError) as e:
+                # Client errors (a malformed query) say nothing about the cluster's health
+                if not isinstance(e, ApiError) or e.meta.status == 429 or e.meta.status >= 500:
+                    self.breaker.record_failure()
+                logger.warning('Elasticsearch search failed, using %s: %s', type(self.fallback).__name__, e)
+            else:
+                self.breaker.record_success()
+                return result
+        self.breaker.count('fallbacks')
+        _fallback_served.set(True)
+        return getattr(self.fallback, method.__name__)(*args, **kwargs)
+    return wrapper
+
+
+class ElasticsearchSearchBackend(BaseSearchBackend):
+    """
+    Elasticsearch search. List pages render from _source and page inside the index.
+    Failures trip a circuit breaker that routes searches to SEARCH_FALLBACK_BACKEND.
+    """
+    breaker = CircuitBreaker('elasticsearch')
+
+    def __init__(self):
+        self.fallback = import_string(settings.SEARCH_FALLBACK_BACKEND)()
+
+    def is_degraded(self):
+        return self.breaker.state() != CLOSED
+
+    def health(self):
+        return {**super().health(), 'fallback': type(self.fallback).__name__, 'breaker': self.breaker.metrics()}
+
+    @with_fallback
+    def scammer_results(self, query, search_field='all'):
+        hits = scammer_search(query, search_field).source(False)[:fts.MAX_RESULTS]
+        return fts.RankedResults(Scammer, [int(hit.meta.id) for hit in hits])
+
+    @with_fallback
+    def scammer_page(self, query, search_field, number, per_page, after=None):
+        # Cards are rendered from _source, so an ES-backed page never touches the database
+        search = scammer_search(query.strip(), search_field).source(SCAMMER_CARD_FIELDS)
+        page = SearchPaginator(search, per_page, after=after).get_page(number)
+        page.object_list = [scammer_card_from_hit(hit) for hit in page.object_list]
+        return page
+
+    @with_fallback
+    def scammer_ids(self, query, search_field='all', after=None, limit=20):
+        return super().scammer_ids(query, search_field, after, limit)
+
+    def ranked_ids(self, query, search_field, after, limit):
+        search = scammer_search(query, search_field).source(False).extra(size=limit + 1)
+        if after:
+            score, last_id = after
+            search = search.extra(search_after=[float(score), int(last_id)])
+        hits = list(search.execute())
+        next_position = list(hits[limit - 1].meta.sort) if len(hits) > limit else None
+        return [int(hit.meta.id) for hit in hits[:limit]], next_position
+
+    @with_fallback
+    def complete_names(self, prefix, limit=10):
+        # The names field is indexed with edge_ngram_analyzer, so a plain match is a prefix lookup
+        search = scammer_search('').sort('_score', '-id').query(
+            "nested", path="names", query=ES_Q("match", **{"names.name": {"query": prefix, "operator": "and"}}),
+            inner_hits={"size": 3, "_source": ["names.name"]}
+        ).source(False)[:limit]
+        names = []
+        for hit in search:
+            for inner in hit.meta.inner_hits['names']:
+                if inner.name not in names:
+                    names.append(inner.name)
+        return names[:limit]
+
+    @with_fallback
+    def profile_results(self, query):
+        search = ScammerProfileDocument.search(using=SEARCH_CONNECTION).query(
+            "match", **{"name": {"query": query, "analyzer": "edge_ngram_analyzer"}}
+        ).source(False)[:fts.MAX_RESULTS]
+        return fts.RankedResults(ScammerProfile, [int(hit.meta.id) for hit in search])
@@ -0,0 +1,89 @@
+"""
+Circuit breaker for the Elasticsearch search backend.
+
+After SEARCH_BREAKER_FAILURES consecutive failures the breaker opens and searches
+go straight to the database fallback for SEARCH_BREAKER_COOLDOWN seconds. It then
+lets a single trial request through: success closes it, failure reopens it.
+State lives in the Django cache, so workers share it when the cache is shared.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Cumulative counters exposed by metrics()
+COUNTERS = ('requests', 'failures', 'fallbacks', 'trips')
+
+
+class CircuitBreaker:
+    def __init__(self, name):
+        self.name = name
+
+    @property
+    def failure_threshold(self):
+        return getattr(settings, 'SEARCH_BREAKER_FAILURES', 5)
+
+    @property
+    def cooldown(self):
+        return getattr(settings, 'SEARCH_BREAKER_COOLDOWN', 30)
+
+    def _key(self, part):
+        return f'search_breaker:{self.name}:{part}'
+
+    def _incr(self, part):
+        key = self._key(part)
+        cache.add(key, 0, None)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, 1, None)
+            return 1
+
+    def count(self, counter):
+        self._incr(f'count:{counter}')
+
+    def state(self):
+        opened_at = cache.get(self._key('opened_at'))
+        if opened_at is None:
+            return CLOSED
+        return OPEN if time.time() < opened_at + self.cooldown else HALF_OPEN
+
+    def allow_request(self):
+        state = self.state()
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            # Only the worker that claims the trial slot probes the cluster
+            return cache.add(self._key('trial'), True, self.cooldown)
+        return False
+
+    def record_success(self):
+        cache.delete_many([self._key('opened_at'), self._key('consecutive_failures'), self._key('trial')])
+
+    def record_failure(self):
+        self.count('failures')
+        failures = self._incr('consecutive_failures')
+        if failures >= self.failure_threshold or self.state() != CLOSED:
+            self.trip()
+
+    def trip(self):
+        cache.set(self._key('opened_at'), time.time(), None)
+        cache.delete_many([self._key('consecutive_failures'), self._key('trial')])
+        self.count('trips')
+
+    def metrics(self):
+        opened_at = cache.get(self._key('opened_at'))
+        return {
+            'state': self.state(),
+            'consecutive_failures': cache.get(self._key('consecutive_failures'), 0),
+            'opened_at': opened_at,
+            'retry_at': opened_at + self.cooldown if opened_at is not None else None,
+            'failure_threshold': self.failure_threshold,
+            'cooldown': self.cooldown,
+            **{counter: cache.get(self._key(f'count:{counter}'), 0) for counter in COUNTERS},
+        }
@@ -0,0 +1,57 @@
+"""
+Result cache for the search entry points (scammer_list and the API SearchView).
+
+Keys embed the current resource versions from scammers/versioning.py, which the
+signals in scammers/signals.py bump on every save and on approve/reject, so a
+change makes every older entry unreachable without deleting it.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from .versioning import get_versions, SCAMMERS
+from .search_backends import get_search_backend, tracking_fallbacks
+
+
+def normalize_query(query):
+    return ' '.join(query.lower().split())
+
+
+def access_level(user):
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+    return 'staff' if user.is_staff else 'user'
+
+
+def _cache_key(namespace, key_data):
+    digest = hashlib.md5(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+    return f'search:{namespace}:{digest}'
+
+
+def cached(request, namespace, params, build, resources=(SCAMMERS,)):
+    """
+    Returns the cached result of `build()` for this namespace and params, computing
+    and storing it on a miss. Language and the user's access level are always part
+    of the key.
+    """
+    versions = get_versions(request, resources)
+    key_data = {
+        'params': params,
+        'versions': [resource.version if resource else 0 for resource in versions.values()],
+        'language': get_language(),
+        'access': access_level(getattr(request, 'user', None)),
+        # Fallback results must not outlive an Elasticsearch outage
+        'degraded': get_search_backend().is_degraded(),
+    }
+
+    result = cache.get(_cache_key(namespace, key_data))
+    if result is None:
+        result, served_fallback = tracking_fallbacks(build)
+        # A failure during build() is answered by the fallback before the breaker
+        # (if ever) opens, so the result is filed by how it was actually served
+        key_data['degraded'] = key_data['degraded'] or served_fallback
+        cache.set(_cache_key(namespace, key_data), result, getattr(settings, 'SEARCH_CACHE_TIMEOUT', 300))
+    return result
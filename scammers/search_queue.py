@@ -0,0 +1,148 @@
+"""
+Deferred Elasticsearch indexing. Instead of re-indexing inside the request, the
+signal processor records which documents are dirty in SearchIndexOutbox (in the
+same transaction as the change), and the process_search_outbox command drains
+the table, coalescing repeated ids into one bulk request per batch.
+"""
+import logging
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models
+from django.db.models import F
+from django_elasticsearch_dsl.apps import DEDConfig
+from django_elasticsearch_dsl.registries import registry
+from django_elasticsearch_dsl.signals import BaseSignalProcessor
+
+from .models import SearchIndexOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(instances):
+    """
+    Marks model instances (or a queryset of them) as needing re-indexing.
+    """
+    if isinstance(instances, models.Model):
+        instances = [instances]
+    elif isinstance(instances, models.QuerySet):
+        instances = [instances.model(pk=pk) for pk in instances.values_list('pk', flat=True)]
+
+    SearchIndexOutbox.objects.bulk_create([
+        SearchIndexOutbox(model_label=instance._meta.label_lower, object_id=instance.pk)
+        for instance in instances if instance is not None and instance.pk is not None
+    ])
+
+
+def handle_status_change(instance):
+    """
+    Queues a scammer whose status changed. Admin actions change status with
+    queryset.update(), which sends no post_save for the signal processor to record.
+    """
+    if DEDConfig.autosync_enabled():
+        enqueue(instance)
+
+
+class OutboxSignalProcessor(BaseSignalProcessor):
+    """
+    Listens to the same signals as RealTimeSignalProcessor but only writes to the outbox.
+    """
+
+    def setup(self):
+        models.signals.post_save.connect(self.handle_save)
+        models.signals.post_delete.connect(self.handle_delete)
+        models.signals.m2m_changed.connect(self.handle_m2m_changed)
+        models.signals.pre_delete.connect(self.handle_pre_delete)
+
+    def teardown(self):
+        models.signals.post_save.disconnect(self.handle_save)
+        models.signals.post_delete.disconnect(self.handle_delete)
+        models.signals.m2m_changed.disconnect(self.handle_m2m_changed)
+        models.signals.pre_delete.disconnect(self.handle_pre_delete)
+
+    def _enqueue_related(self, instance):
+        for doc in registry._get_related_doc(instance):
+            try:
+                related = doc().get_instances_from_related(instance)
+            except ObjectDoesNotExist:
+                related = None
+            if related is not None:
+                enqueue(related)
+
+    def handle_save(self, sender, instance, **kwargs):
+        if not DEDConfig.autosync_enabled():
+            return
+        if instance.__class__ in registry._models:
+            enqueue(instance)
+        self._enqueue_related(instance)
+
+    def handle_pre_delete(self, sender, instance, **kwargs):
+        # The parents of a deleted child must be looked up before the row is gone
+        if not DEDConfig.autosync_enabled():
+            return
+        self._enqueue_related(instance)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        # The worker deletes documents whose object no longer exists
+        if not DEDConfig.autosync_enabled():
+            return
+        if instance.__class__ in registry._models:
+            enqueue(instance)
+
+
+def process_batch(batch_size=500):
+    """
+    Indexes one batch of outbox entries with a bulk request per document type and
+    removes the entries that were indexed. Entries whose documents failed stay in
+    the outbox with their attempt count raised, behind the entries not yet tried,
+    until SEARCH_OUTBOX_MAX_ATTEMPTS is reached. Returns the number of entries removed.
+    Entries stay in the outbox when Elasticsearch cannot be reached.
+    """
+    entries = list(
+        SearchIndexOutbox.objects.order_by('attempts', 'pk')
+        .values_list('pk', 'model_label', 'object_id', 'attempts')[:batch_size]
+    )
+    if not entries:
+        return 0
+
+    dirty = defaultdict(set)
+    for _, model_label, object_id, _ in entries:
+        dirty[model_label].add(object_id)
+
+    failed = set()
+    for model_label, object_ids in dirty.items():
+        model = apps.get_model(model_label)
+        for doc_class in registry.get_documents(models=[model]):
+            doc = doc_class()
+            instances = list(doc.get_queryset().filter(pk__in=object_ids))
+            existing_ids = {instance.pk for instance in instances}
+
+            actions = list(doc.get_actions(instances, 'index'))
+            actions += [
+                {'_op_type': 'delete', '_index': doc._index._name, '_id': object_id}
+                for object_id in object_ids - existing_ids
+            ]
+            _, errors = doc.bulk(actions, raise_on_error=False)
+            for error in errors:
+                result = next(iter(error.values()), {})
+                # Deleting a document that was never indexed is not a failure
+                if result.get('status') != 404:
+                    logger.error('Search indexing failed: %s', error)
+                    failed.add((model_label, str(result.get('_id'))))
+
+    max_attempts = getattr(settings, 'SEARCH_OUTBOX_MAX_ATTEMPTS', 5)
+    done, retry = [], []
+    for pk, model_label, object_id, attempts in entries:
+        if (model_label, str(object_id)) not in failed:
+            done.append(pk)
+        elif attempts + 1 >= max_attempts:
+            logger.error('Giving up indexing %s #%s after %d attempts', model_label, object_id, attempts + 1)
+            done.append(pk)
+        else:
+            retry.append(pk)
+
+    SearchIndexOutbox.objects.filter(pk__in=retry).update(attempts=F('attempts') + 1)
+    SearchIndexOutbox.objects.filter(pk__in=done).delete()
+    return len(done)
@@ -0,0 +1,72 @@
+"""
+Maintenance of the PostgreSQL search_vector columns read by PostgresSearchBackend.
+
+The signals in scammers/signals.py recompute the vector of just the affected
+scammer or profile. Child values are aggregated by correlated subqueries, one per
+relation, so a refresh never joins the relations against each other.
+"""
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import connection
+from django.db.models import OuterRef, Subquery, TextField
+
+from .models import Scammer, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerPaymentAccount, ScammerProfile
+
+
+def is_available():
+    return connection.vendor == 'postgresql'
+
+
+def _joined(queryset, field):
+    """
+    Space-joined values of one child field for the outer scammer.
+    """
+    return Subquery(
+        queryset.filter(scammer_id=OuterRef('pk')).order_by()
+        .values('scammer_id').annotate(text=StringAgg(field, delimiter=' ')).values('text'),
+        output_field=TextField(),
+    )
+
+
+def scammer_vector():
+    return (
+        SearchVector(_joined(ScammerName.objects.all(), 'name'), weight='A') +
+        SearchVector(_joined(ScammerPhoneNumber.objects.all(), 'phone_number'), weight='A') +
+        SearchVector(_joined(ScammerEmail.objects.all(), 'email'), weight='A') +
+        SearchVector(_joined(ScammerPaymentAccount.objects.all(), 'account_number'), weight='A') +
+        SearchVector(_joined(Scammer.tags.through.objects.all(), 'tag__name'), weight='A') +
+        SearchVector(_joined(ScammerWebsite.objects.all(), 'website'), weight='B') +
+        SearchVector('description', weight='B')
+    )
+
+
+def profile_vector():
+    return SearchVector('name', weight='A')
+
+
+def refresh_scammers(scammer_ids):
+    Scammer.objects.filter(pk__in=scammer_ids).update(search_vector=scammer_vector())
+
+
+def refresh_profiles(profile_ids):
+    ScammerProfile.objects.filter(pk__in=profile_ids).update(search_vector=profile_vector())
+
+
+def rebuild(model, chunk_size=1000, start_after=0, missing_only=False):
+    """
+    Recomputes vectors in primary-key order, one UPDATE per chunk, yielding
+    (rows updated, last pk) after each chunk so an interrupted run can resume.
+    """
+    refresh = refresh_scammers if model is Scammer else refresh_profiles
+    queryset = model.objects.order_by('pk')
+    if missing_only:
+        queryset = queryset.filter(search_vector__isnull=True)
+
+    last_pk = start_after
+    while True:
+        ids = list(queryset.filter(pk__gt=last_pk).values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return
+        refresh(ids)
+        last_pk = ids[-1]
+        yield len(ids), last_pk
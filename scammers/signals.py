@@ -1,58 +1,227 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from .models import Scammer, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerPaymentAccount
-
-def link_related_scammers(instance, field_name):
-    """
-    Finds and links scammers who share the same data point (e.g., phone number, email).
-    
-    :param instance: The model instance that was just saved (e.g., ScammerPhoneNumber).
-    :param field_name: The name of the field to check for matches (e.g., 'phone_number').
-    """
-    try:
-        # Get the value of the field from the instance
-        value = getattr(instance, field_name)
-        if not value:
-            return
-
-        # The scammer profile that triggered the signal
-        source_scammer = instance.scammer
-
-        # Find all other instances of the same model with the same value (case-insensitive),
-        # excluding the one that was just saved.
-        filter_kwargs = {f'{field_name}__iexact': value}
-        related_instances = instance.__class__.objects.filter(**filter_kwargs).exclude(pk=instance.pk)
-
-        # Get the Scammer objects linked to these instances
-        related_scammers = Scammer.objects.filter(
-            pk__in=related_instances.values_list('scammer_id', flat=True)
-        ).exclude(pk=source_scammer.pk)
-
-        # Link them
-        for related_scammer in related_scammers:
-            source_scammer.related_scammers.add(related_scammer)
-            # The relationship is symmetrical, so this is not strictly needed
-            # but it makes the connection explicit.
-            related_scammer.related_scammers.add(source_scammer)
-
-    except Exception as e:
-        # It's often best not to crash the save operation due to a linking error.
-        # You might want to log this error instead.
-        print(f"Error in linking scammers: {e}")
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver, Signal
+from .models import Scammer, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerImage, ScammerPaymentAccount, ScammerCustomField, Tag, ScammerProfile
+from .identifiers import refresh_identifiers, link_related_scammers
+from . import fts
+from . import search_vectors
+from . import bloom
+from . import clustering
+from . import search_queue
+from . import versioning
 
+# Sent by the moderation views and admin actions after a scammer's status changes,
+# with `instance`, `old_status` and `new_status`.
+scammer_status_changed = Signal()
+
+# Keep the normalized identifier index in step with the identifier rows. A save that
+# adds a new name, phone, email or account key also links the scammer to the others
+# sharing it and merges their clusters; saves that leave the normalized value
+# unchanged add no key and link nothing. New keys of approved scammers are published
+# to the identifier filter as a delta.
+def link_new_identifiers(scammer_id, kind):
+    added = refresh_identifiers(scammer_id, kind)
+    related_ids = link_related_scammers(scammer_id, kind, added)
+    clustering.merge(scammer_id, related_ids)
+    bloom.handle_identifiers_added(scammer_id, kind, added)
+
+@receiver(post_save, sender=ScammerName)
+def link_name_identifiers(sender, instance, **kwargs):
+    link_new_identifiers(instance.scammer_id, 'name')
 
 @receiver(post_save, sender=ScammerPhoneNumber)
-def handle_phone_number_save(sender, instance, created, **kwargs):
-    link_related_scammers(instance, 'phone_number')
+def link_phone_identifiers(sender, instance, **kwargs):
+    link_new_identifiers(instance.scammer_id, 'phone')
 
 @receiver(post_save, sender=ScammerEmail)
-def handle_email_save(sender, instance, created, **kwargs):
-    link_related_scammers(instance, 'email')
+def link_email_identifiers(sender, instance, **kwargs):
+    link_new_identifiers(instance.scammer_id, 'email')
+
+@receiver(post_save, sender=ScammerPaymentAccount)
+def link_account_identifiers(sender, instance, **kwargs):
+    link_new_identifiers(instance.scammer_id, 'account')
+
+@receiver(post_delete, sender=ScammerName)
+def sync_name_identifiers(sender, instance, **kwargs):
+    refresh_identifiers(instance.scammer_id, 'name')
+
+@receiver(post_delete, sender=ScammerPhoneNumber)
+def sync_phone_identifiers(sender, instance, **kwargs):
+    refresh_identifiers(instance.scammer_id, 'phone')
+
+@receiver(post_delete, sender=ScammerEmail)
+def sync_email_identifiers(sender, instance, **kwargs):
+    refresh_identifiers(instance.scammer_id, 'email')
+
+@receiver(post_save, sender=ScammerWebsite)
+@receiver(post_delete, sender=ScammerWebsite)
+def sync_domain_identifiers(sender, instance, **kwargs):
+    added = refresh_identifiers(instance.scammer_id, 'domain')
+    bloom.handle_identifiers_added(instance.scammer_id, 'domain', added)
+
+@receiver(post_delete, sender=ScammerPaymentAccount)
+def sync_account_identifiers(sender, instance, **kwargs):
+    refresh_identifiers(instance.scammer_id, 'account')
+
+
+# Keep the SQLite full-text tables in step with the rows ScammerDocument indexes.
+@receiver(post_save, sender=Scammer)
+def sync_scammer_fts(sender, instance, **kwargs):
+    if fts.is_available():
+        fts.refresh_scammer(instance.pk)
+
+@receiver(post_delete, sender=Scammer)
+def delete_scammer_fts(sender, instance, **kwargs):
+    if fts.is_available():
+        fts.refresh_scammer(instance.pk)
 
 @receiver(post_save, sender=ScammerName)
-def handle_name_save(sender, instance, created, **kwargs):
-    link_related_scammers(instance, 'name')
+@receiver(post_delete, sender=ScammerName)
+@receiver(post_save, sender=ScammerPhoneNumber)
+@receiver(post_delete, sender=ScammerPhoneNumber)
+@receiver(post_save, sender=ScammerEmail)
+@receiver(post_delete, sender=ScammerEmail)
+@receiver(post_save, sender=ScammerWebsite)
+@receiver(post_delete, sender=ScammerWebsite)
+@receiver(post_save, sender=ScammerPaymentAccount)
+@receiver(post_delete, sender=ScammerPaymentAccount)
+def sync_scammer_fts_from_related(sender, instance, **kwargs):
+    if fts.is_available():
+        fts.refresh_scammer(instance.scammer_id)
+
+@receiver(m2m_changed, sender=Scammer.tags.through)
+def sync_scammer_fts_from_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if not fts.is_available():
+        return
+    if reverse and action == 'pre_clear':
+        # Clearing from the tag side: the scammers are only known before the rows go
+        instance._fts_scammer_ids = list(instance.scammer_set.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            fts.refresh_scammer(instance.pk)
+        else:
+            # A tag was (un)assigned from the tag side; pk_set holds scammer ids
+            scammer_ids = pk_set if pk_set is not None else getattr(instance, '_fts_scammer_ids', [])
+            for scammer_id in scammer_ids:
+                fts.refresh_scammer(scammer_id)
+
+@receiver(post_save, sender=Tag)
+def sync_scammer_fts_from_tag_rename(sender, instance, created, **kwargs):
+    if fts.is_available() and not created:
+        for scammer_id in instance.scammer_set.values_list('id', flat=True):
+            fts.refresh_scammer(scammer_id)
+
+# Deleting a tag removes its through rows without an m2m_changed signal
+@receiver(pre_delete, sender=Tag)
+def record_tagged_scammers_fts(sender, instance, **kwargs):
+    if fts.is_available():
+        instance._fts_scammer_ids = list(instance.scammer_set.values_list('id', flat=True))
+
+@receiver(post_delete, sender=Tag)
+def sync_scammer_fts_from_tag_delete(sender, instance, **kwargs):
+    if fts.is_available():
+        for scammer_id in getattr(instance, '_fts_scammer_ids', []):
+            fts.refresh_scammer(scammer_id)
 
+@receiver(post_save, sender=ScammerProfile)
+@receiver(post_delete, sender=ScammerProfile)
+def sync_profile_fts(sender, instance, **kwargs):
+    if fts.is_available():
+        fts.refresh_profile(instance.pk)
+
+
+# Keep the PostgreSQL search vectors of the affected scammer or profile current.
+@receiver(post_save, sender=Scammer)
+def sync_scammer_search_vector(sender, instance, **kwargs):
+    if search_vectors.is_available():
+        search_vectors.refresh_scammers([instance.pk])
+
+@receiver(post_save, sender=ScammerName)
+@receiver(post_delete, sender=ScammerName)
+@receiver(post_save, sender=ScammerPhoneNumber)
+@receiver(post_delete, sender=ScammerPhoneNumber)
+@receiver(post_save, sender=ScammerEmail)
+@receiver(post_delete, sender=ScammerEmail)
+@receiver(post_save, sender=ScammerWebsite)
+@receiver(post_delete, sender=ScammerWebsite)
 @receiver(post_save, sender=ScammerPaymentAccount)
-def handle_payment_account_save(sender, instance, created, **kwargs):
-    link_related_scammers(instance, 'account_number')
\ No newline at end of file
+@receiver(post_delete, sender=ScammerPaymentAccount)
+def sync_scammer_search_vector_from_related(sender, instance, **kwargs):
+    if search_vectors.is_available():
+        search_vectors.refresh_scammers([instance.scammer_id])
+
+@receiver(m2m_changed, sender=Scammer.tags.through)
+def sync_scammer_search_vector_from_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if not search_vectors.is_available():
+        return
+    if reverse and action == 'pre_clear':
+        # Clearing from the tag side: the scammers are only known before the rows go
+        instance._search_vector_scammer_ids = list(instance.scammer_set.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            search_vectors.refresh_scammers([instance.pk])
+        else:
+            scammer_ids = pk_set if pk_set is not None else getattr(instance, '_search_vector_scammer_ids', [])
+            search_vectors.refresh_scammers(scammer_ids)
+
+@receiver(post_save, sender=Tag)
+def sync_scammer_search_vector_from_tag_rename(sender, instance, created, **kwargs):
+    if search_vectors.is_available() and not created:
+        search_vectors.refresh_scammers(instance.scammer_set.values_list('id', flat=True))
+
+@receiver(pre_delete, sender=Tag)
+def record_tagged_scammers_search_vector(sender, instance, **kwargs):
+    if search_vectors.is_available():
+        instance._search_vector_scammer_ids = list(instance.scammer_set.values_list('id', flat=True))
+
+@receiver(post_delete, sender=Tag)
+def sync_scammer_search_vector_from_tag_delete(sender, instance, **kwargs):
+    if search_vectors.is_available():
+        search_vectors.refresh_scammers(getattr(instance, '_search_vector_scammer_ids', []))
+
+@receiver(post_save, sender=ScammerProfile)
+def sync_profile_search_vector(sender, instance, **kwargs):
+    if search_vectors.is_available():
+        search_vectors.refresh_profiles([instance.pk])
+
+
+@receiver(scammer_status_changed)
+def update_identifier_filter(sender, instance, old_status, new_status, **kwargs):
+    bloom.handle_status_change(instance.pk, old_status, new_status)
+
+@receiver(scammer_status_changed)
+def reindex_scammer_on_status_change(sender, instance, **kwargs):
+    search_queue.handle_status_change(instance)
+
+
+# Bump resource versions so conditional GETs stop answering 304 for changed data.
+@receiver([post_save, post_delete], sender=Scammer)
+@receiver([post_save, post_delete], sender=ScammerName)
+@receiver([post_save, post_delete], sender=ScammerPhoneNumber)
+@receiver([post_save, post_delete], sender=ScammerEmail)
+@receiver([post_save, post_delete], sender=ScammerWebsite)
+@receiver([post_save, post_delete], sender=ScammerImage)
+@receiver([post_save, post_delete], sender=ScammerPaymentAccount)
+@receiver([post_save, post_delete], sender=ScammerCustomField)
+@receiver([post_save, post_delete], sender=Tag)
+@receiver(scammer_status_changed)
+def bump_scammers_version(sender, **kwargs):
+    versioning.bump(versioning.SCAMMERS)
+
+@receiver(m2m_changed, sender=Scammer.tags.through)
+@receiver(m2m_changed, sender=Scammer.related_scammers.through)
+def bump_scammers_version_from_m2m(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        versioning.bump(versioning.SCAMMERS)
+
+@receiver([post_save, post_delete], sender=Tag)
+def bump_tags_version(sender, **kwargs):
+    versioning.bump(versioning.TAGS)
+
+@receiver([post_save, post_delete], sender=ScammerProfile)
+def bump_profiles_version(sender, **kwargs):
+    versioning.bump(versioning.PROFILES)
+
+@receiver(m2m_changed, sender=ScammerProfile.cases.through)
+def bump_profiles_version_from_m2m(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        versioning.bump(versioning.PROFILES)
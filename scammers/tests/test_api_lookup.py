@@ -0,0 +1,68 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.serializers import MAX_LOOKUP_IDENTIFIERS
+from scammers.models import Scammer, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerPaymentAccount
+
+
+class IdentifierLookupTests(TestCase):
+    url = '/api/lookup/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.scammer = Scammer.objects.create(status='approved')
+        ScammerPhoneNumber.objects.create(scammer=self.scammer, phone_number='09123456789')
+        ScammerEmail.objects.create(scammer=self.scammer, email='scam@example.com')
+        ScammerWebsite.objects.create(scammer=self.scammer, website='https://www.example.com/pay')
+        ScammerPaymentAccount.objects.create(scammer=self.scammer, account_number='1234 5678')
+        pending = Scammer.objects.create(status='pending')
+        ScammerEmail.objects.create(scammer=pending, email='pending@example.com')
+
+    def lookup(self, *identifiers):
+        return self.client.post(self.url, {
+            'identifiers': [{'type': kind, 'value': value} for kind, value in identifiers],
+        }, format='json')
+
+    def test_matches_normalized_values_of_every_kind(self):
+        response = self.lookup(
+            ('phone', '+95 9 123 456 789'),
+            ('email', 'SCAM@example.com'),
+            ('domain', 'example.com'),
+            ('account', '1234-5678'),
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(
+            [(result['normalized'], result['matches']) for result in results],
+            [
+                ('+959123456789', [{'scammer_id': self.scammer.pk, 'field': 'phone_numbers'}]),
+                ('scam@example.com', [{'scammer_id': self.scammer.pk, 'field': 'emails'}]),
+                ('example.com', [{'scammer_id': self.scammer.pk, 'field': 'websites'}]),
+                ('12345678', [{'scammer_id': self.scammer.pk, 'field': 'payment_accounts'}]),
+            ],
+        )
+
+    def test_results_keep_request_order_and_values(self):
+        results = self.lookup(('email', 'nobody@example.com'), ('phone', 'not a phone')).json()['results']
+        self.assertEqual(
+            [(result['type'], result['value'], result['normalized'], result['matches']) for result in results],
+            [('email', 'nobody@example.com', 'nobody@example.com', []), ('phone', 'not a phone', None, [])],
+        )
+
+    def test_pending_scammers_are_not_matched(self):
+        results = self.lookup(('email', 'pending@example.com')).json()['results']
+        self.assertEqual(results[0]['matches'], [])
+
+    def test_one_query_per_kind(self):
+        identifiers = [('email', f'user{i}@example.com') for i in range(50)] + [('phone', '09123456789')]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.lookup(*identifiers).status_code, 200)
+        self.assertEqual(len(queries), 2)
+
+    def test_invalid_requests_are_rejected(self):
+        self.assertEqual(self.lookup().status_code, 400)
+        self.assertEqual(self.lookup(('name', 'Aung')).status_code, 400)
+        too_many = [('email', f'user{i}@example.com') for i in range(MAX_LOOKUP_IDENTIFIERS + 1)]
+        self.assertEqual(self.lookup(*too_many).status_code, 400)
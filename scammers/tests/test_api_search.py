@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.pagination import encode_cursor
+from scammers.models import Scammer, ScammerName, ScammerPhoneNumber, ScammerPaymentAccount
+
+
+class SearchViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def create_scammer(self, name, status='approved', description='lottery prize'):
+        scammer = Scammer.objects.create(status=status, description=description)
+        ScammerName.objects.create(scammer=scammer, name=name)
+        return scammer
+
+    def search(self, **params):
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def result_ids(self, data):
+        return [result['id'] for result in data['results']]
+
+    def test_empty_query_returns_no_results(self):
+        self.assertEqual(self.search(q=''), {'next': None, 'results': []})
+
+    def test_only_approved_scammers_are_found(self):
+        approved = self.create_scammer('Aung')
+        self.create_scammer('Aung', status='pending')
+        self.assertEqual(self.result_ids(self.search(q='aung')), [approved.pk])
+
+    def test_cursor_pages_through_every_result_once(self):
+        ids = {self.create_scammer(f'Name {i}').pk for i in range(5)}
+
+        seen = []
+        data = self.search(q='lottery', page_size=2)
+        while True:
+            self.assertLessEqual(len(data['results']), 2)
+            seen += self.result_ids(data)
+            if not data['next']:
+                break
+            data = self.client.get(data['next']).json()
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(set(seen), ids)
+
+    def test_phone_query_pages_by_cursor(self):
+        ids = set()
+        for i in range(3):
+            scammer = self.create_scammer(f'Name {i}')
+            ScammerPhoneNumber.objects.create(scammer=scammer, phone_number='09123456789')
+            ids.add(scammer.pk)
+
+        first = self.search(q='09123456789', page_size=2)
+        second = self.client.get(first['next']).json()
+        self.assertEqual(set(self.result_ids(first) + self.result_ids(second)), ids)
+        self.assertIsNone(second['next'])
+
+    def test_digit_only_query_finds_payment_accounts(self):
+        scammer = self.create_scammer('Aung')
+        ScammerPaymentAccount.objects.create(scammer=scammer, account_number='5566778899')
+        self.assertEqual(self.result_ids(self.search(q='5566778899')), [scammer.pk])
+        self.assertEqual(self.result_ids(self.search(q='556677')), [scammer.pk])
+
+    def test_invalid_cursor_is_not_found(self):
+        self.create_scammer('Aung')
+        for cursor in (
+            'not-a-cursor',
+            encode_cursor('all', 'SQLiteFTSSearchBackend', 'x'),
+            encode_cursor('email', 'SQLiteFTSSearchBackend', 0),
+        ):
+            response = self.client.get('/api/search/', {'q': 'aung', 'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+    def test_cursor_from_another_backend_restarts_paging(self):
+        scammer = self.create_scammer('Aung')
+        data = self.search(q='aung', cursor=encode_cursor('all', 'ElasticsearchSearchBackend', 1.5, 99))
+        self.assertEqual(self.result_ids(data), [scammer.pk])
@@ -0,0 +1,109 @@
+from django.contrib.admin.sites import site
+from django.test import TestCase
+
+from scammers import bloom
+from scammers.bloom import BloomFilter, filter_key, filters_since, publish_full_filter
+from scammers.models import Scammer, ScammerPhoneNumber, ScammerEmail, IdentifierFilter
+from scammers.signals import scammer_status_changed
+
+
+def published_contains(key, filters):
+    return any(key in BloomFilter(f.bit_count, f.hash_count, f.data) for f in filters)
+
+
+class BloomFilterTests(TestCase):
+    def test_added_keys_are_members(self):
+        keys = [filter_key('phone', f'+95912345{i:04d}') for i in range(500)]
+        bloom_filter = BloomFilter.for_capacity(len(keys))
+        for key in keys:
+            bloom_filter.add(key)
+        self.assertTrue(all(key in bloom_filter for key in keys))
+
+    def test_false_positive_rate_stays_near_target(self):
+        bloom_filter = BloomFilter.for_capacity(1000)
+        for i in range(1000):
+            bloom_filter.add(filter_key('email', f'member{i}@example.com'))
+        false_positives = sum(filter_key('email', f'other{i}@example.com') in bloom_filter for i in range(10000))
+        self.assertLess(false_positives, 50)
+
+    def test_round_trips_through_its_bytes(self):
+        bloom_filter = BloomFilter.for_capacity(10)
+        bloom_filter.add('phone:+959123456789')
+        copy = BloomFilter(bloom_filter.bits, bloom_filter.hashes, bytes(bloom_filter.data))
+        self.assertIn('phone:+959123456789', copy)
+
+
+class PublishedFilterTests(TestCase):
+    def setUp(self):
+        self.approved = Scammer.objects.create(status='approved')
+        ScammerPhoneNumber.objects.create(scammer=self.approved, phone_number='09123456789')
+        self.pending = Scammer.objects.create(status='pending')
+        ScammerEmail.objects.create(scammer=self.pending, email='pending@example.com')
+        self.full = publish_full_filter()
+
+    def change_status(self, scammer, new_status):
+        old_status = scammer.status
+        scammer.status = new_status
+        scammer.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            scammer_status_changed.send(sender=Scammer, instance=scammer, old_status=old_status, new_status=new_status)
+
+    def test_full_filter_holds_only_approved_identifiers(self):
+        self.assertEqual(self.full.item_count, 1)
+        self.assertTrue(published_contains('phone:+959123456789', [self.full]))
+        self.assertFalse(published_contains('email:pending@example.com', [self.full]))
+
+    def test_approval_publishes_a_delta(self):
+        self.change_status(self.pending, 'approved')
+
+        filters = filters_since(self.full.version)
+        self.assertEqual([f.filter_type for f in filters], [IdentifierFilter.DELTA])
+        self.assertTrue(published_contains('email:pending@example.com', filters))
+
+    def test_identifier_added_to_approved_scammer_publishes_a_delta(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ScammerEmail.objects.create(scammer=self.approved, email='late@add.com')
+
+        filters = filters_since(self.full.version)
+        self.assertEqual([(f.filter_type, f.item_count) for f in filters], [(IdentifierFilter.DELTA, 1)])
+        self.assertTrue(published_contains('email:late@add.com', filters))
+
+    def test_identifier_added_to_pending_scammer_publishes_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ScammerEmail.objects.create(scammer=self.pending, email='other@example.com')
+        self.assertEqual(filters_since(self.full.version), [])
+
+    def test_rejection_rebuilds_the_full_filter(self):
+        self.change_status(self.approved, 'rejected')
+
+        latest = IdentifierFilter.objects.order_by('-version').first()
+        self.assertEqual(latest.filter_type, IdentifierFilter.FULL)
+        self.assertEqual(latest.item_count, 0)
+        self.assertFalse(IdentifierFilter.objects.filter(version=self.full.version).exists())
+
+    def test_bulk_rejection_rebuilds_the_full_filter_once(self):
+        rejected = [Scammer.objects.create(status='approved') for _ in range(10)]
+        for index, scammer in enumerate(rejected):
+            ScammerPhoneNumber.objects.create(scammer=scammer, phone_number=f'0977788{index:04d}')
+        queryset = Scammer.objects.filter(pk__in=[scammer.pk for scammer in rejected])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            site._registry[Scammer].make_rejected(None, queryset)
+
+        # A full filter deletes the versions before it, so count versions rather than rows
+        latest = IdentifierFilter.objects.get()
+        self.assertEqual(latest.version, self.full.version + 1)
+        self.assertEqual((latest.filter_type, latest.item_count), (IdentifierFilter.FULL, 1))
+
+    def test_clients_behind_a_full_filter_get_the_latest_one(self):
+        bloom.publish_delta_filter(self.approved.pk)
+        rebuilt = publish_full_filter()
+        self.assertEqual(filters_since(self.full.version), [rebuilt])
+        self.assertEqual(filters_since(None), [rebuilt])
+
+    def test_filter_endpoint(self):
+        response = self.client.get('/api/identifier-filter/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['version'], self.full.version)
+        self.assertEqual([f['type'] for f in data['filters']], [IdentifierFilter.FULL])
@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from scammers import clustering
+from scammers.clustering import UnionFind
+from scammers.models import Scammer, ScammerName, ScammerEmail, ScammerPhoneNumber, ScammerProfile
+
+
+class UnionFindTests(TestCase):
+    def test_components_are_rooted_at_their_smallest_item(self):
+        components = UnionFind()
+        components.union(5, 3)
+        components.union(9, 7)
+        components.union(7, 5)
+        components.union(1, 2)
+
+        self.assertEqual({item: components.find(item) for item in (3, 5, 7, 9)}, {3: 3, 5: 3, 7: 3, 9: 3})
+        self.assertEqual(components.find(2), 1)
+        self.assertNotIn(4, components)
+
+    def test_long_chains_resolve_without_recursion(self):
+        components = UnionFind()
+        for item in range(1, 5000):
+            components.union(item + 1, item)
+        self.assertEqual(components.find(5000), 1)
+
+
+class ClusteringTests(TestCase):
+    def setUp(self):
+        # a - b share a phone, b - c share an email, d shares nothing
+        self.a, self.b, self.c, self.d = (Scammer.objects.create(status='approved') for _ in range(4))
+        ScammerPhoneNumber.objects.create(scammer=self.a, phone_number='09123456789')
+        ScammerPhoneNumber.objects.create(scammer=self.b, phone_number='09123456789')
+        ScammerEmail.objects.create(scammer=self.b, email='scam@example.com')
+        ScammerEmail.objects.create(scammer=self.c, email='scam@example.com')
+        ScammerEmail.objects.create(scammer=self.d, email='alone@example.com')
+
+    def cluster_ids(self):
+        return dict(Scammer.objects.values_list('pk', 'cluster_id'))
+
+    def test_new_identifiers_merge_clusters(self):
+        self.assertEqual(self.cluster_ids(), {self.a.pk: self.a.pk, self.b.pk: self.a.pk, self.c.pk: self.a.pk, self.d.pk: None})
+
+    def test_rebuild_matches_incremental_merges(self):
+        expected = self.cluster_ids()
+        Scammer.objects.update(cluster_id=None)
+
+        updated, clustered = clustering.rebuild(chunk_size=2)
+        self.assertEqual((updated, clustered), (3, 3))
+        self.assertEqual(self.cluster_ids(), expected)
+        self.assertEqual(clustering.rebuild(), (0, 3))
+
+    def test_rebuild_splits_clusters_after_a_deletion(self):
+        ScammerEmail.objects.filter(scammer=self.c).delete()
+        clustering.rebuild()
+        self.assertEqual(self.cluster_ids()[self.c.pk], None)
+        self.assertEqual(self.cluster_ids()[self.b.pk], self.a.pk)
+
+    @override_settings(RELATED_LINK_MAX_FANOUT=1)
+    def test_common_keys_do_not_cluster(self):
+        for scammer in (self.a, self.c, self.d):
+            ScammerName.objects.create(scammer=scammer, name='Mg Mg')
+        clustering.rebuild()
+        self.assertEqual(self.cluster_ids()[self.d.pk], None)
+
+    def test_proposals_skip_fully_profiled_clusters(self):
+        self.assertEqual(list(clustering.proposals()), [{'cluster_id': self.a.pk, 'size': 3, 'unprofiled': 3}])
+
+        profile = ScammerProfile.objects.create(name='Ring')
+        profile.cases.add(self.a, self.b, self.c)
+        self.assertEqual(list(clustering.proposals()), [])
+
+    def test_cluster_members(self):
+        ScammerName.objects.create(scammer=self.b, name='Aung')
+        members = clustering.cluster_members([self.a.pk])[self.a.pk]
+        self.assertEqual([scammer.pk for scammer in members], [self.a.pk, self.b.pk, self.c.pk])
+        self.assertEqual(members[1].first_name, 'Aung')
+
+    def test_proposal_page_is_staff_only(self):
+        self.assertEqual(self.client.get('/en/clusters/').status_code, 302)
+
+        User.objects.create_superuser('staff', 'staff@example.com', 'password')
+        self.client.login(username='staff', password='password')
+        response = self.client.get('/en/clusters/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'?cluster={self.a.pk}')
@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from scammers.models import Scammer, ScammerName
+
+
+class ConditionalGetTests(TestCase):
+    url = '/api/scammers/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.scammer = Scammer.objects.create(status='approved')
+        ScammerName.objects.create(scammer=self.scammer, name='Aung')
+
+    def test_response_carries_etag_and_last_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_matching_etag_is_answered_with_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_change_invalidates_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        ScammerName.objects.create(scammer=self.scammer, name='Ko')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_the_request(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, {'page': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_site_list_page_is_conditional(self):
+        # The first visit sets the CSRF cookie, which is part of the page's ETag
+        self.client.get('/en/')
+        response = self.client.get('/en/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/en/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
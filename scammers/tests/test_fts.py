@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from scammers import fts
+from scammers.models import Scammer, ScammerName, ScammerPaymentAccount, Tag
+
+
+class ScammerFTSSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.scammer = Scammer.objects.create(status='approved', description='fake investment')
+        ScammerName.objects.create(scammer=self.scammer, name='Aung')
+        self.tag = Tag.objects.create(name='crypto')
+        self.scammer.tags.add(self.tag)
+
+    def tag_matches(self):
+        return fts.search_scammer_ids('crypto', 'tag')
+
+    def test_related_rows_are_indexed(self):
+        ScammerPaymentAccount.objects.create(scammer=self.scammer, account_number='5566778899')
+        self.assertEqual(self.tag_matches(), [self.scammer.pk])
+        self.assertEqual(fts.search_scammer_ids('5566778899', 'account'), [self.scammer.pk])
+        self.assertEqual(fts.search_scammer_ids('investment'), [self.scammer.pk])
+
+    def test_removing_the_tag_from_the_scammer(self):
+        self.scammer.tags.remove(self.tag)
+        self.assertEqual(self.tag_matches(), [])
+
+    def test_clearing_the_tag_from_the_tag_side(self):
+        self.tag.scammer_set.clear()
+        self.assertEqual(self.tag_matches(), [])
+        response = self.client.get('/en/', {'q': 'crypto', 'search_field': 'tag'})
+        self.assertNotContains(response, 'Aung')
+
+    def test_renaming_the_tag(self):
+        self.tag.name = 'romance'
+        self.tag.save()
+        self.assertEqual(self.tag_matches(), [])
+        self.assertEqual(fts.search_scammer_ids('romance', 'tag'), [self.scammer.pk])
+
+    def test_deleting_the_tag(self):
+        self.tag.delete()
+        self.assertEqual(self.tag_matches(), [])
@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from scammers import fuzzy_names
+from scammers.fuzzy_names import BANDS, buckets, similarity, shingles
+from scammers.models import Scammer, ScammerName, NameSignature, NameMatchCandidate
+
+
+class MinHashTests(TestCase):
+    def test_shingles_mark_word_boundaries(self):
+        self.assertEqual(shingles('ab'), {' ab', 'ab '})
+        self.assertEqual(shingles('a'), {' a '})
+
+    def test_similarity_is_trigram_jaccard(self):
+        self.assertEqual(similarity('aung ko', 'aung ko'), 1.0)
+        self.assertEqual(similarity('abc', 'xyz'), 0.0)
+        self.assertGreater(similarity('aung kyaw', 'aung kyaw min'), 0.5)
+
+    def test_buckets_are_stable_per_band(self):
+        keys = buckets('aung kyaw min')
+        self.assertEqual(len(keys), BANDS)
+        self.assertEqual(keys, buckets('aung kyaw min'))
+        self.assertTrue(all(-2 ** 63 <= key < 2 ** 63 for key in keys))
+
+    def test_similar_names_share_a_bucket(self):
+        self.assertTrue(set(buckets('aung kyaw min')) & set(buckets('aung kyaw minn')))
+
+    def test_unrelated_names_share_no_bucket(self):
+        self.assertFalse(set(buckets('aung kyaw min')) & set(buckets('thandar hlaing')))
+
+
+class CandidateTests(TestCase):
+    def create_scammer(self, name):
+        scammer = Scammer.objects.create(status='approved')
+        ScammerName.objects.create(scammer=scammer, name=name)
+        return scammer
+
+    def match(self, **kwargs):
+        return list(fuzzy_names.match_new_names(**kwargs))
+
+    def test_near_duplicate_names_become_candidates(self):
+        first = self.create_scammer('Aung Kyaw Min')
+        second = self.create_scammer('Aung Kyaw Minn')
+        self.create_scammer('Thandar Hlaing')
+
+        self.assertEqual(self.match(), [(3, 1)])
+        candidate = NameMatchCandidate.objects.get()
+        self.assertEqual((candidate.scammer_id, candidate.candidate_id), (first.pk, second.pk))
+        self.assertEqual((candidate.name, candidate.candidate_name), ('aung kyaw min', 'aung kyaw minn'))
+        self.assertGreaterEqual(candidate.score, 0.5)
+
+    def test_only_new_names_are_signed(self):
+        self.create_scammer('Aung Kyaw Min')
+        self.match()
+        self.create_scammer('Aung Kyaw Minn')
+
+        self.assertEqual(self.match(batch_size=1), [(1, 1)])
+        self.assertEqual(self.match(), [])
+        self.assertEqual(NameMatchCandidate.objects.count(), 1)
+
+    def test_related_scammers_are_not_proposed(self):
+        first = self.create_scammer('Aung Kyaw Min')
+        second = self.create_scammer('Aung Kyaw Minn')
+        first.related_scammers.add(second)
+
+        self.match()
+        self.assertFalse(NameMatchCandidate.objects.exists())
+
+    def test_names_below_the_threshold_are_not_proposed(self):
+        self.create_scammer('Aung Kyaw Min')
+        self.create_scammer('Aung Kyaw Minn')
+        self.match(min_score=0.99)
+        self.assertFalse(NameMatchCandidate.objects.exists())
+
+    def test_prune_drops_signatures_of_removed_names(self):
+        scammer = self.create_scammer('Aung Kyaw Min')
+        self.match()
+        scammer.names.all().delete()
+
+        self.assertEqual(fuzzy_names.prune(), 1)
+        self.assertFalse(NameSignature.objects.exists())
+
+    def test_linking_a_candidate_relates_and_clusters_the_scammers(self):
+        first = self.create_scammer('Aung Kyaw Min')
+        second = self.create_scammer('Aung Kyaw Minn')
+        self.match()
+        candidate = NameMatchCandidate.objects.get()
+
+        User.objects.create_superuser('staff', 'staff@example.com', 'password')
+        self.client.login(username='staff', password='password')
+        response = self.client.post(f'/en/name-matches/{candidate.pk}/review/', {'decision': 'link'})
+        self.assertEqual(response.status_code, 302)
+
+        candidate.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(candidate.status, 'linked')
+        self.assertIn(second, first.related_scammers.all())
+        self.assertEqual(second.cluster_id, first.pk)
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from scammers.graph import neighbourhood, walk, MAX_DEPTH
+from scammers.models import Scammer, ScammerName
+
+
+class NeighbourhoodTests(TestCase):
+    def setUp(self):
+        # A chain 0 - 1 - 2 - 3 - 4 - 5 with a triangle 0 - 1 - 6, and 7 pending behind 1
+        self.scammers = [Scammer.objects.create(status='approved') for _ in range(7)]
+        self.scammers.append(Scammer.objects.create(status='pending'))
+        for index, scammer in enumerate(self.scammers):
+            ScammerName.objects.create(scammer=scammer, name=f'Scammer {index}')
+        for a, b in [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (0, 6), (1, 6), (1, 7)]:
+            self.scammers[a].related_scammers.add(self.scammers[b])
+        self.ids = [scammer.pk for scammer in self.scammers]
+
+    def depths(self, depth, limit=100):
+        return {self.ids.index(node_id): hops for node_id, hops in walk(self.ids[0], depth, limit)}
+
+    def test_walk_stops_at_the_depth_limit(self):
+        self.assertEqual(self.depths(1), {0: 0, 1: 1, 6: 1})
+        self.assertEqual(self.depths(2), {0: 0, 1: 1, 6: 1, 2: 2})
+        self.assertEqual(self.depths(MAX_DEPTH), {0: 0, 1: 1, 6: 1, 2: 2, 3: 3})
+
+    def test_nodes_keep_their_shortest_distance(self):
+        # 6 is reachable in one hop and in two (through 1)
+        self.assertEqual(self.depths(3)[6], 1)
+
+    def test_pending_scammers_are_not_followed(self):
+        self.assertNotIn(7, self.depths(3))
+
+    def test_limit_keeps_the_nearest_nodes(self):
+        rows = walk(self.ids[0], 3, 3)
+        self.assertEqual([hops for _node_id, hops in rows], [0, 1, 1])
+
+    def test_neighbourhood_returns_edges_between_returned_nodes(self):
+        data = neighbourhood(self.ids[0], depth=1)
+        self.assertEqual([node['name'] for node in data['nodes']], ['Scammer 0', 'Scammer 1', 'Scammer 6'])
+        self.assertEqual(data['edges'], [
+            [self.ids[0], self.ids[1]],
+            [self.ids[0], self.ids[6]],
+            [self.ids[1], self.ids[6]],
+        ])
+        self.assertFalse(data['truncated'])
+
+    def test_neighbourhood_reports_truncation(self):
+        data = neighbourhood(self.ids[0], depth=3, limit=2)
+        self.assertEqual(len(data['nodes']), 2)
+        self.assertTrue(data['truncated'])
+
+
+class GraphEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.first, self.second = (Scammer.objects.create(status='approved') for _ in range(2))
+        self.first.related_scammers.add(self.second)
+
+    def test_depth_and_limit_are_clamped(self):
+        data = self.client.get(f'/api/scammers/{self.first.pk}/graph/', {'depth': 9, 'limit': 0}).json()
+        self.assertEqual((data['depth'], data['limit']), (MAX_DEPTH, 1))
+        self.assertEqual([node['id'] for node in data['nodes']], [self.first.pk])
+        self.assertTrue(data['truncated'])
+
+    def test_pending_start_scammer_is_not_found(self):
+        pending = Scammer.objects.create(status='pending')
+        self.assertEqual(self.client.get(f'/api/scammers/{pending.pk}/graph/').status_code, 404)
@@ -0,0 +1,83 @@
+from django.test import TestCase
+
+from scammers.identifiers import (
+    normalize_phone, normalize_email, normalize_domain, normalize_account, normalize_name,
+    identifier_kind, is_account_like, lookup_scammer_ids, refresh_identifiers,
+)
+from scammers.models import Scammer, ScammerIdentifier, ScammerPhoneNumber, ScammerEmail, ScammerWebsite
+
+
+class NormalizerTests(TestCase):
+    def test_phone_numbers_share_their_e164_key(self):
+        self.assertEqual(normalize_phone('09 123 456 789'), '+959123456789')
+        self.assertEqual(normalize_phone('+95 9-123-456-789'), '+959123456789')
+        self.assertEqual(normalize_phone('0095 9123456789'), '+959123456789')
+
+    def test_phone_numbers_outside_e164_lengths_are_rejected(self):
+        self.assertIsNone(normalize_phone('123'))
+        self.assertIsNone(normalize_phone('+1234567890123456'))
+        self.assertIsNone(normalize_phone('no digits'))
+        self.assertIsNone(normalize_phone(''))
+
+    def test_email_is_lowercased_and_validated(self):
+        self.assertEqual(normalize_email('  Scam@Example.COM '), 'scam@example.com')
+        self.assertIsNone(normalize_email('not an email'))
+
+    def test_domain_is_the_host_without_www(self):
+        self.assertEqual(normalize_domain('https://WWW.Example.com/path?q=1'), 'example.com')
+        self.assertEqual(normalize_domain('shop.example.com'), 'shop.example.com')
+        self.assertIsNone(normalize_domain('localhost'))
+
+    def test_account_drops_spaces_and_dashes(self):
+        self.assertEqual(normalize_account('0912 345-678'), '0912345678')
+        self.assertEqual(normalize_account('KBZ-Pay 12'), 'kbzpay12')
+
+    def test_name_is_casefolded_with_collapsed_whitespace(self):
+        self.assertEqual(normalize_name('  Aung   AUNG '), 'aung aung')
+        self.assertIsNone(normalize_name('   '))
+
+
+class IdentifierKindTests(TestCase):
+    def test_email_and_phone_shaped_queries(self):
+        self.assertEqual(identifier_kind('scam@example.com'), 'email')
+        self.assertEqual(identifier_kind('+95 9 123 456 789'), 'phone')
+        self.assertEqual(identifier_kind('5566778899'), 'phone')
+
+    def test_text_and_short_numbers_are_text_searches(self):
+        self.assertIsNone(identifier_kind('lottery winner'))
+        self.assertIsNone(identifier_kind('12345'))
+
+    def test_digit_only_queries_may_be_accounts(self):
+        self.assertTrue(is_account_like('5566 7788-99'))
+        self.assertFalse(is_account_like('+95 9 123'))
+        self.assertFalse(is_account_like('kbz123'))
+
+
+class IdentifierIndexTests(TestCase):
+    def setUp(self):
+        self.scammer = Scammer.objects.create(status='approved')
+
+    def test_saving_identifier_rows_indexes_normalized_keys(self):
+        ScammerPhoneNumber.objects.create(scammer=self.scammer, phone_number='09123456789')
+        ScammerEmail.objects.create(scammer=self.scammer, email='Scam@Example.com')
+        ScammerWebsite.objects.create(scammer=self.scammer, website='https://www.example.com/x')
+
+        self.assertEqual(list(lookup_scammer_ids('phone', '+95 9 123 456 789')), [self.scammer.pk])
+        self.assertEqual(list(lookup_scammer_ids('email', 'scam@example.com')), [self.scammer.pk])
+        self.assertEqual(list(lookup_scammer_ids('domain', 'example.com')), [self.scammer.pk])
+
+    def test_deleting_a_row_removes_its_key(self):
+        phone = ScammerPhoneNumber.objects.create(scammer=self.scammer, phone_number='09123456789')
+        phone.delete()
+        self.assertFalse(ScammerIdentifier.objects.filter(scammer=self.scammer, kind='phone').exists())
+
+    def test_refresh_returns_only_new_keys(self):
+        ScammerPhoneNumber.objects.create(scammer=self.scammer, phone_number='09123456789')
+        self.assertEqual(refresh_identifiers(self.scammer.pk, 'phone'), set())
+
+        ScammerPhoneNumber.objects.create(scammer=self.scammer, phone_number='09987654321')
+        ScammerIdentifier.objects.filter(value='+959987654321').delete()
+        self.assertEqual(refresh_identifiers(self.scammer.pk, 'phone'), {'+959987654321'})
+
+    def test_unnormalizable_lookup_matches_nothing(self):
+        self.assertEqual(list(lookup_scammer_ids('email', 'nope')), [])
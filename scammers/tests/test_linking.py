@@ -0,0 +1,64 @@
+from django.test import TestCase, override_settings
+
+from scammers.identifiers import link_related_scammers
+from scammers.models import Scammer, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerPaymentAccount
+
+
+class RelatedScammerLinkingTests(TestCase):
+    def related_ids(self, scammer):
+        return set(scammer.related_scammers.values_list('pk', flat=True))
+
+    def test_shared_identifiers_link_both_ways(self):
+        first, second, third = (Scammer.objects.create(status='approved') for _ in range(3))
+        ScammerPhoneNumber.objects.create(scammer=first, phone_number='09123456789')
+        ScammerPhoneNumber.objects.create(scammer=second, phone_number='+95 9 123 456 789')
+        ScammerEmail.objects.create(scammer=first, email='scam@example.com')
+        ScammerEmail.objects.create(scammer=third, email='SCAM@example.com')
+
+        self.assertEqual(self.related_ids(first), {second.pk, third.pk})
+        self.assertEqual(self.related_ids(second), {first.pk})
+        self.assertEqual(self.related_ids(third), {first.pk})
+
+    def test_names_and_accounts_link(self):
+        first, second = (Scammer.objects.create(status='approved') for _ in range(2))
+        ScammerName.objects.create(scammer=first, name='Aung  Ko')
+        ScammerName.objects.create(scammer=second, name='aung ko')
+        self.assertEqual(self.related_ids(first), {second.pk})
+
+        third = Scammer.objects.create(status='approved')
+        ScammerPaymentAccount.objects.create(scammer=first, account_number='1234-5678')
+        ScammerPaymentAccount.objects.create(scammer=third, account_number='12345678')
+        self.assertEqual(self.related_ids(first), {second.pk, third.pk})
+
+    def test_different_identifiers_do_not_link(self):
+        first, second = (Scammer.objects.create(status='approved') for _ in range(2))
+        ScammerEmail.objects.create(scammer=first, email='one@example.com')
+        ScammerEmail.objects.create(scammer=second, email='two@example.com')
+        self.assertEqual(self.related_ids(first), set())
+
+    @override_settings(RELATED_LINK_MAX_FANOUT=2)
+    def test_keys_shared_by_too_many_scammers_are_not_linked(self):
+        scammers = [Scammer.objects.create(status='approved') for _ in range(4)]
+        for scammer in scammers:
+            ScammerName.objects.create(scammer=scammer, name='Mg Mg')
+
+        # The third scammer still links to the first two; the fourth would make a key shared by three others
+        self.assertEqual(self.related_ids(scammers[2]), {scammers[0].pk, scammers[1].pk})
+        self.assertEqual(self.related_ids(scammers[3]), set())
+
+    def test_linking_is_idempotent(self):
+        first, second = (Scammer.objects.create(status='approved') for _ in range(2))
+        ScammerEmail.objects.create(scammer=first, email='scam@example.com')
+        ScammerEmail.objects.create(scammer=second, email='scam@example.com')
+
+        self.assertEqual(link_related_scammers(second.pk, 'email', {'scam@example.com'}), {first.pk})
+        self.assertEqual(Scammer.related_scammers.through.objects.count(), 2)
+
+    def test_resaving_an_unchanged_identifier_links_nothing_new(self):
+        first, second = (Scammer.objects.create(status='approved') for _ in range(2))
+        ScammerEmail.objects.create(scammer=first, email='scam@example.com')
+        email = ScammerEmail.objects.create(scammer=second, email='scam@example.com')
+        first.related_scammers.clear()
+
+        email.save()
+        self.assertEqual(self.related_ids(first), set())
@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+
+from scammers import pagination, search_backends
+from scammers.pagination import SearchPaginator, encode_after, decode_after
+
+TOTAL = 25
+
+
+def execute(search, ignore_cache=False):
+    # An index of TOTAL hits whose sort value is their position
+    body = search.to_dict()
+    if 'search_after' in body:
+        start = body['search_after'][0] + 1
+    else:
+        start = body.get('from', 0)
+    positions = range(start, min(start + body.get('size', 10), TOTAL))
+    hits = [
+        {'_id': str(position), '_score': None, 'sort': [position], '_source': {
+            'display_name': f'Scammer {position}', 'created_at': '2024-01-01T00:00:00', 'description': '', 'tags': [],
+        }}
+        for position in positions
+    ]
+    return Response(search, {'hits': {'total': {'value': TOTAL, 'relation': 'eq'}, 'hits': hits}})
+
+
+@mock.patch.object(pagination, 'MAX_RESULT_WINDOW', 10)
+@mock.patch.object(pagination, 'SEEK_CHUNK_SIZE', 4)
+@mock.patch.object(Search, 'execute', autospec=True, side_effect=execute)
+class SearchPaginatorTests(SimpleTestCase):
+    def page(self, number, after=None):
+        return SearchPaginator(Search().sort('id'), 5, after=after).get_page(number)
+
+    def requests(self, execute_mock):
+        return [call.args[0].to_dict() for call in execute_mock.call_args_list]
+
+    def ids(self, page):
+        return [int(hit.meta.id) for hit in page.object_list]
+
+    def test_token_round_trip(self, execute_mock):
+        self.assertEqual(decode_after(encode_after(4, [1.5, 99])), (4, [1.5, 99]))
+
+    def test_tampered_token_decodes_to_nothing(self, execute_mock):
+        for token in ('not-a-token', encode_after(4, [1])[:-2], encode_after('4', [1]), encode_after(4, 1)):
+            self.assertEqual(decode_after(token), (None, None), token)
+
+    def test_pages_within_the_window_use_from_and_size(self, execute_mock):
+        page = self.page(2)
+        self.assertEqual(self.ids(page), [5, 6, 7, 8, 9])
+        self.assertEqual(page.paginator.num_pages, 5)
+        self.assertEqual(decode_after(page.next_after), (3, [9]))
+        self.assertEqual(len(execute_mock.call_args_list), 1)
+
+    def test_deep_page_uses_the_token_of_the_previous_page(self, execute_mock):
+        page = self.page(3, after=self.page(2).next_after)
+        self.assertEqual(self.ids(page), [10, 11, 12, 13, 14])
+        self.assertEqual(self.requests(execute_mock)[-1]['search_after'], [9])
+        self.assertEqual(len(execute_mock.call_args_list), 2)
+
+    def test_token_for_another_page_seeks_instead(self, execute_mock):
+        page = self.page(5, after=self.page(2).next_after)
+        self.assertEqual(self.ids(page), [20, 21, 22, 23, 24])
+        self.assertIsNone(page.next_after)
+
+    def test_tampered_token_seeks_instead(self, execute_mock):
+        page = self.page(4, after='not-a-token')
+        self.assertEqual(self.ids(page), [15, 16, 17, 18, 19])
+        # Seeking jumps to the end of the window, then walks forward in SEEK_CHUNK_SIZE steps
+        self.assertEqual(
+            [(request.get('from'), request.get('size'), request.get('search_after')) for request in self.requests(execute_mock)],
+            [(9, 1, None), (None, 4, [9]), (None, 1, [13]), (None, 5, [14])],
+        )
+
+    def test_out_of_range_pages_fall_back_to_the_last_page(self, execute_mock):
+        self.assertEqual(self.page(99).number, 5)
+        self.assertEqual(self.page('x').number, 1)
+
+
+@override_settings(SEARCH_BACKEND='scammers.search_backends.ElasticsearchSearchBackend')
+@mock.patch.object(pagination, 'MAX_RESULT_WINDOW', 18)
+@mock.patch.object(Search, 'execute', autospec=True, side_effect=execute)
+class ScammerListPagingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        search_backends._load_backend.cache_clear()
+        self.addCleanup(search_backends._load_backend.cache_clear)
+
+    def names(self, response):
+        return [card['name'] for card in response.context['page_obj'].object_list]
+
+    def test_next_link_carries_the_token(self, execute_mock):
+        response = self.client.get('/en/', {'q': 'aung', 'page': 2})
+        self.assertEqual(response.status_code, 200)
+        after = response.context['page_obj'].next_after
+        self.assertEqual(decode_after(after), (3, [17]))
+
+        response = self.client.get('/en/', {'q': 'aung', 'page': 3, 'after': after})
+        self.assertEqual(self.names(response), [f'Scammer {position}' for position in range(18, 25)])
+        self.assertEqual(execute_mock.call_args_list[-1].args[0].to_dict()['search_after'], [17])
+
+    def test_tampered_token_still_renders_the_page(self, execute_mock):
+        response = self.client.get('/en/', {'q': 'aung', 'page': 3, 'after': 'tampered'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.names(response), [f'Scammer {position}' for position in range(18, 25)])
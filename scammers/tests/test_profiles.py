@@ -0,0 +1,42 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from scammers.models import Scammer, ScammerName, ScammerProfile
+
+
+class AddScammerProfileTests(TestCase):
+    url = '/en/profiles/add/'
+
+    def setUp(self):
+        User.objects.create_superuser('staff', 'staff@example.com', 'password')
+        self.client.login(username='staff', password='password')
+        self.cases = [Scammer.objects.create(status='approved') for _ in range(2)]
+        ScammerName.objects.create(scammer=self.cases[0], name='Aung')
+
+    def tagify_value(self, *case_ids):
+        return json.dumps([{'value': str(case_id)} for case_id in case_ids])
+
+    def test_submitted_cases_are_linked(self):
+        response = self.client.post(self.url, {'name': 'Ring', 'cases': self.tagify_value(self.cases[0].pk, 9999)})
+        self.assertRedirects(response, '/en/profiles/', fetch_redirect_response=False)
+        profile = ScammerProfile.objects.get()
+        self.assertEqual(list(profile.cases.all()), [self.cases[0]])
+
+    def test_comma_separated_cases_are_linked(self):
+        self.client.post(self.url, {'name': 'Ring', 'cases': f'{self.cases[0].pk}, {self.cases[1].pk}, x'})
+        self.assertEqual(set(ScammerProfile.objects.get().cases.all()), set(self.cases))
+
+    def test_invalid_form_keeps_the_submitted_cases(self):
+        response = self.client.post(self.url, {'name': '', 'cases': self.tagify_value(*[case.pk for case in self.cases])})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['initial_cases'], [
+            {'value': str(self.cases[0].pk), 'name': 'Aung', 'searchBy': 'Aung'},
+            {'value': str(self.cases[1].pk), 'name': '', 'searchBy': ''},
+        ])
+
+    def test_cluster_prefills_the_cases(self):
+        Scammer.objects.filter(pk__in=[case.pk for case in self.cases]).update(cluster_id=self.cases[0].pk)
+        response = self.client.get(self.url, {'cluster': self.cases[0].pk})
+        self.assertEqual([case['value'] for case in response.context['initial_cases']], [str(case.pk) for case in self.cases])
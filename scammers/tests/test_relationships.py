@@ -0,0 +1,37 @@
+from django.test import TestCase
+
+from scammers.models import Scammer, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerPaymentAccount
+
+
+class RelationshipReasonTests(TestCase):
+    def setUp(self):
+        self.scammer = Scammer.objects.create(status='approved')
+        self.other = Scammer.objects.create(status='approved')
+
+    def test_reasons_match_formatting_variants_of_linked_identifiers(self):
+        ScammerPhoneNumber.objects.create(scammer=self.scammer, phone_number='09 777 888 999')
+        ScammerPhoneNumber.objects.create(scammer=self.other, phone_number='+959777888999')
+        ScammerPaymentAccount.objects.create(scammer=self.scammer, account_number='KBZ 0912-777-888')
+        ScammerPaymentAccount.objects.create(scammer=self.other, account_number='kbz0912777888')
+        ScammerName.objects.create(scammer=self.scammer, name='Ko  Zaw')
+        ScammerName.objects.create(scammer=self.other, name='ko zaw')
+
+        self.assertIn(self.other, self.scammer.related_scammers.all())
+        self.assertEqual(self.scammer.get_relationship_reasons_map([self.other.pk]), {
+            self.other.pk: ['Phone: +959777888999', 'Name: ko zaw', 'Account: kbz0912777888'],
+        })
+
+    def test_reasons_for_many_scammers_take_one_query_per_kind(self):
+        third = Scammer.objects.create(status='approved')
+        ScammerEmail.objects.create(scammer=self.scammer, email='scam@example.com')
+        ScammerEmail.objects.create(scammer=self.other, email='SCAM@example.com')
+        ScammerEmail.objects.create(scammer=third, email='other@example.com')
+
+        with self.assertNumQueries(len(Scammer.RELATIONSHIP_KINDS)):
+            reasons = self.scammer.get_relationship_reasons_map([self.other.pk, third.pk])
+        self.assertEqual(reasons, {self.other.pk: ['Email: scam@example.com'], third.pk: []})
+
+    def test_single_pair_reasons(self):
+        ScammerEmail.objects.create(scammer=self.scammer, email='scam@example.com')
+        ScammerEmail.objects.create(scammer=self.other, email='scam@example.com')
+        self.assertEqual(self.scammer.get_relationship_reasons(self.other), ['Email: scam@example.com'])
@@ -0,0 +1,128 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from elastic_transport import ApiResponseMeta, ConnectionTimeout, HttpHeaders, NodeConfig
+from elasticsearch import ApiError
+
+from scammers import search_backends
+from scammers.search_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def api_error(status):
+    meta = ApiResponseMeta(
+        status=status, http_version='1.1', headers=HttpHeaders(), duration=0.0,
+        node=NodeConfig('http', 'localhost', 9200),
+    )
+    return ApiError(f'status {status}', meta, {})
+
+
+@override_settings(SEARCH_BREAKER_FAILURES=3, SEARCH_BREAKER_COOLDOWN=30)
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.breaker = CircuitBreaker('test')
+        self.now = 1000.0
+        clock = mock.patch('scammers.search_breaker.time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_success_resets_the_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), CLOSED)
+
+    def test_half_open_after_cooldown_allows_a_single_trial(self):
+        self.breaker.trip()
+        self.now += 29
+        self.assertEqual(self.breaker.state(), OPEN)
+
+        self.now += 1
+        self.assertEqual(self.breaker.state(), HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_successful_trial_closes(self):
+        self.breaker.trip()
+        self.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success()
+
+        self.assertEqual(self.breaker.state(), CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_failed_trial_reopens_for_another_cooldown(self):
+        self.breaker.trip()
+        self.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state(), OPEN)
+        self.now += 30
+        self.assertEqual(self.breaker.state(), HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_metrics(self):
+        self.breaker.count('requests')
+        self.breaker.record_failure()
+        self.breaker.trip()
+        metrics = self.breaker.metrics()
+        self.assertEqual(
+            {key: metrics[key] for key in ('state', 'requests', 'failures', 'trips', 'retry_at')},
+            {'state': OPEN, 'requests': 1, 'failures': 1, 'trips': 1, 'retry_at': self.now + 30},
+        )
+
+
+@override_settings(
+    SEARCH_BACKEND='scammers.search_backends.ElasticsearchSearchBackend',
+    SEARCH_FALLBACK_BACKEND='scammers.search_backends.DatabaseSearchBackend',
+    SEARCH_BREAKER_FAILURES=2,
+)
+class WithFallbackTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        search_backends._load_backend.cache_clear()
+        self.addCleanup(search_backends._load_backend.cache_clear)
+        self.backend = search_backends.get_search_backend()
+        self.fallback = mock.patch.object(self.backend.fallback, 'complete_names', return_value=['from fallback'])
+        self.fallback.start()
+        self.addCleanup(self.fallback.stop)
+
+    def complete(self, side_effect):
+        # complete_names is the simplest search behind with_fallback; the ES call is stubbed
+        with mock.patch('scammers.search_backends.ES_Q', side_effect=side_effect) as es_call, \
+                mock.patch.object(search_backends.logger, 'warning'):
+            return self.backend.complete_names('aung'), es_call.call_count
+
+    def test_cluster_failures_fall_back_and_trip_the_breaker(self):
+        self.assertEqual(self.complete(ConnectionTimeout('timed out')), (['from fallback'], 1))
+        self.assertEqual(self.complete(api_error(503)), (['from fallback'], 1))
+        self.assertEqual(self.backend.breaker.state(), OPEN)
+        self.assertTrue(self.backend.is_degraded())
+
+        # While open, Elasticsearch is not called at all
+        self.assertEqual(self.complete(AssertionError('not called')), (['from fallback'], 0))
+
+    def test_rate_limiting_counts_as_a_failure(self):
+        self.complete(api_error(429))
+        self.complete(api_error(429))
+        self.assertEqual(self.backend.breaker.state(), OPEN)
+
+    def test_client_errors_do_not_count_as_failures(self):
+        for _ in range(5):
+            self.assertEqual(self.complete(api_error(400)), (['from fallback'], 1))
+        self.assertEqual(self.backend.breaker.state(), CLOSED)
+        self.assertEqual(self.backend.breaker.metrics()['failures'], 0)
+        self.assertEqual(self.backend.breaker.metrics()['fallbacks'], 5)
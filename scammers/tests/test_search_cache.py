@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from elastic_transport import ConnectionError
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+from rest_framework.test import APIClient
+
+from scammers import search_backends
+from scammers.models import Scammer, ScammerName
+
+
+@override_settings(SEARCH_BACKEND='scammers.search_backends.ElasticsearchSearchBackend')
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        search_backends._load_backend.cache_clear()
+        self.addCleanup(search_backends._load_backend.cache_clear)
+        self.client = APIClient()
+        self.scammer = Scammer.objects.create(status='approved')
+        ScammerName.objects.create(scammer=self.scammer, name='Aung')
+
+    def healthy_execute(self):
+        scammer_id = self.scammer.pk
+
+        def execute(search, ignore_cache=False):
+            hits = [{'_id': str(scammer_id), '_score': 1.0, 'sort': [1.0, scammer_id], '_source': {}}]
+            return Response(search, {'hits': {'total': {'value': 1, 'relation': 'eq'}, 'hits': hits}})
+        return mock.patch.object(Search, 'execute', autospec=True, side_effect=execute)
+
+    def failing_execute(self):
+        return mock.patch.object(Search, 'execute', side_effect=ConnectionError('unreachable'))
+
+    def search(self):
+        response = self.client.get('/api/search/', {'q': 'aung'})
+        self.assertEqual(response.status_code, 200)
+        return [result['id'] for result in response.json()['results']]
+
+    def test_repeated_searches_are_served_from_the_cache(self):
+        with self.healthy_execute() as execute:
+            self.assertEqual(self.search(), [self.scammer.pk])
+            self.assertEqual(self.search(), [self.scammer.pk])
+        self.assertEqual(execute.call_count, 1)
+
+    def test_fallback_results_are_not_cached_as_healthy_ones(self):
+        # One failure answers from the database without opening the breaker
+        with self.failing_execute(), self.assertLogs(search_backends.logger, 'WARNING'):
+            self.assertEqual(self.search(), [self.scammer.pk])
+        self.assertFalse(search_backends.get_search_backend().is_degraded())
+
+        with self.healthy_execute() as execute:
+            self.search()
+        self.assertEqual(execute.call_count, 1)
+
+    def test_tracking_fallbacks_reports_fallback_searches(self):
+        backend = search_backends.get_search_backend()
+        with self.healthy_execute():
+            self.assertEqual(search_backends.tracking_fallbacks(lambda: backend.scammer_ids('aung', 'all')[0]), ([self.scammer.pk], False))
+        with self.failing_execute(), self.assertLogs(search_backends.logger, 'WARNING'):
+            self.assertEqual(search_backends.tracking_fallbacks(lambda: backend.scammer_ids('aung', 'all')[0]), ([self.scammer.pk], True))
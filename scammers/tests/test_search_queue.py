@@ -0,0 +1,111 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django_elasticsearch_dsl.documents import DocType
+
+from scammers import search_queue
+from scammers.models import Scammer, ScammerName, SearchIndexOutbox
+
+
+class FakeBulk:
+    """
+    Stands in for DocType.bulk, failing the ids it is given with a status code.
+    """
+
+    def __init__(self, failures=None):
+        self.failures = failures or {}
+        self.actions = []
+
+    def __call__(self, actions, **kwargs):
+        errors = []
+        for action in actions:
+            self.actions.append(action)
+            object_id = str(action['_id'])
+            if object_id in self.failures:
+                errors.append({action.get('_op_type', 'index'): {'_id': object_id, 'status': self.failures[object_id]}})
+        return len(self.actions) - len(errors), errors
+
+
+class ProcessBatchTests(TestCase):
+    def setUp(self):
+        self.scammers = [Scammer.objects.create(status='approved') for _ in range(3)]
+        SearchIndexOutbox.objects.all().delete()
+
+    def process(self, fake_bulk, **kwargs):
+        # Failures are logged; keep them out of the test output
+        with mock.patch.object(DocType, 'bulk', fake_bulk), mock.patch.object(search_queue, 'logger'):
+            return search_queue.process_batch(**kwargs)
+
+    def outbox(self):
+        return list(SearchIndexOutbox.objects.order_by('object_id').values_list('object_id', 'attempts'))
+
+    def test_enqueue_accepts_instances_and_querysets(self):
+        search_queue.enqueue(self.scammers[0])
+        search_queue.enqueue(Scammer.objects.filter(pk__in=[s.pk for s in self.scammers[1:]]))
+        self.assertEqual([object_id for object_id, _ in self.outbox()], [s.pk for s in self.scammers])
+
+    def test_repeated_entries_are_indexed_once(self):
+        search_queue.enqueue(self.scammers[0])
+        search_queue.enqueue(self.scammers[0])
+        fake_bulk = FakeBulk()
+
+        self.assertEqual(self.process(fake_bulk), 2)
+        self.assertEqual([action['_id'] for action in fake_bulk.actions], [self.scammers[0].pk])
+        self.assertEqual(self.outbox(), [])
+
+    def test_deleted_objects_are_deleted_from_the_index(self):
+        missing = Scammer(pk=9999)
+        search_queue.enqueue(missing)
+        fake_bulk = FakeBulk(failures={'9999': 404})
+
+        self.assertEqual(self.process(fake_bulk), 1)
+        self.assertEqual(fake_bulk.actions[0]['_op_type'], 'delete')
+        self.assertEqual(self.outbox(), [])
+
+    def test_failed_entries_stay_for_retry(self):
+        search_queue.enqueue(self.scammers)
+        failed = self.scammers[1].pk
+        fake_bulk = FakeBulk(failures={str(failed): 400})
+
+        self.assertEqual(self.process(fake_bulk), 2)
+        self.assertEqual(self.outbox(), [(failed, 1)])
+
+    @override_settings(SEARCH_OUTBOX_MAX_ATTEMPTS=2)
+    def test_entries_are_dropped_after_max_attempts(self):
+        search_queue.enqueue(self.scammers[0])
+        fake_bulk = FakeBulk(failures={str(self.scammers[0].pk): 500})
+
+        self.assertEqual(self.process(fake_bulk), 0)
+        self.assertEqual(self.outbox(), [(self.scammers[0].pk, 1)])
+        self.assertEqual(self.process(fake_bulk), 1)
+        self.assertEqual(self.outbox(), [])
+
+    def test_failed_entries_wait_behind_untried_ones(self):
+        search_queue.enqueue(self.scammers[0])
+        self.process(FakeBulk(failures={str(self.scammers[0].pk): 400}))
+        search_queue.enqueue(self.scammers[1])
+        fake_bulk = FakeBulk()
+
+        self.process(fake_bulk, batch_size=1)
+        self.assertEqual([action['_id'] for action in fake_bulk.actions], [self.scammers[1].pk])
+
+    def test_unreachable_cluster_keeps_the_batch(self):
+        search_queue.enqueue(self.scammers[0])
+        with mock.patch.object(DocType, 'bulk', side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                search_queue.process_batch()
+        self.assertEqual(self.outbox(), [(self.scammers[0].pk, 0)])
+
+
+class OutboxSignalProcessorTests(TestCase):
+    @override_settings(ELASTICSEARCH_DSL_AUTOSYNC=True)
+    def test_saves_are_queued_with_their_parent_documents(self):
+        scammer = Scammer.objects.create(status='approved')
+        SearchIndexOutbox.objects.all().delete()
+        ScammerName.objects.create(scammer=scammer, name='Aung')
+        self.assertIn(('scammers.scammer', scammer.pk), SearchIndexOutbox.objects.values_list('model_label', 'object_id'))
+
+    @override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+    def test_nothing_is_queued_without_autosync(self):
+        Scammer.objects.create(status='approved')
+        self.assertFalse(SearchIndexOutbox.objects.exists())
@@ -12,6 +12,9 @@ urlpatterns = [
     path('scammer/<int:pk>/approve/', views.approve_scammer, name='approve_scammer'),
     path('scammer/<int:pk>/reject/', views.reject_scammer, name='reject_scammer'),
     path('pending/', views.pending_scammers, name='pending_scammers'),
+    path('clusters/', views.cluster_proposals, name='cluster_proposals'),
+    path('name-matches/', views.name_match_candidates, name='name_match_candidates'),
+    path('name-matches/<int:pk>/review/', views.review_name_match, name='review_name_match'),
     path('register/', views.register, name='register'),
     path('login/', LoginView.as_view(template_name='scammers/login.html', form_class=LoginForm), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
@@ -0,0 +1,70 @@
+"""
+Per-resource change versions backing ETag / Last-Modified on the public list pages
+and the API. Versions are bumped by the signals in scammers/signals.py, so a
+conditional GET can be answered with a 304 from one primary-key lookup.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from .models import ResourceVersion
+
+SCAMMERS = 'scammers'
+PROFILES = 'profiles'
+# Tag names only, for the in-process tag prefix index (scammers/autocomplete.py)
+TAGS = 'tags'
+
+
+def bump(*names):
+    now = timezone.now()
+    for name in names:
+        updated = ResourceVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=now)
+        if not updated:
+            ResourceVersion.objects.get_or_create(name=name, defaults={'version': 1, 'updated_at': now})
+
+
+def get_versions(request, names):
+    """
+    Returns {name: ResourceVersion} for the given resources, cached on the request so
+    the ETag and Last-Modified functions share one query.
+    """
+    cache = getattr(request, '_resource_versions', None)
+    if cache is None:
+        cache = request._resource_versions = {}
+    missing = [name for name in names if name not in cache]
+    if missing:
+        for resource in ResourceVersion.objects.filter(name__in=missing):
+            cache[resource.name] = resource
+        for name in missing:
+            cache.setdefault(name, None)
+    return {name: cache[name] for name in names}
+
+
+def conditional_on(*names):
+    """
+    View decorator emitting ETag and Last-Modified derived from the named resource
+    versions, and answering a matching If-None-Match / If-Modified-Since with 304
+    before the view runs.
+    """
+    def etag_func(request, *args, **kwargs):
+        versions = get_versions(request, names)
+        user = getattr(request, 'user', None)
+        parts = [
+            ','.join(f'{name}:{resource.version if resource else 0}' for name, resource in versions.items()),
+            request.get_full_path(),
+            get_language() or '',
+            str(user.pk) if user is not None and user.is_authenticated else '',
+            request.headers.get('Accept', ''),
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        ]
+        return hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def last_modified_func(request, *args, **kwargs):
+        timestamps = [resource.updated_at for resource in get_versions(request, names).values() if resource]
+        return max(timestamps) if timestamps else None
+
+    return condition(etag_func=etag_func, last_modified_func=last_modified_func)
@@ -1,74 +1,69 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from .documents import ScammerDocument, ScammerProfileDocument
-
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from .search_backends import get_search_backend
+from .signals import scammer_status_changed
+from .versioning import conditional_on, SCAMMERS
+from . import search_cache
+from . import clustering
+from . import fuzzy_names
+from .autocomplete import case_entries
+
+import json
 from django.db import transaction
 from django.utils import timezone
 from django.contrib.admin.views.decorators import staff_member_required
-from elasticsearch_dsl.query import Q
-from .models import Scammer, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerImage, Tag, ScammerProfile
+from django.views.decorators.http import require_POST
+from .models import Scammer, ScammerName, ScammerPhoneNumber, ScammerEmail, ScammerWebsite, ScammerImage, Tag, ScammerProfile, NameMatchCandidate
 from .forms import ScammerForm, ScammerNameFormSet, ScammerPhoneNumberFormSet, ScammerEmailFormSet, ScammerWebsiteFormSet, ScammerImageFormSet, ScammerPaymentAccountFormSet, ScammerProfileForm
 
 
 from django.core.paginator import Paginator
 
+@conditional_on(SCAMMERS)
 def scammer_list(request):
     query = request.GET.get('q', '')
     search_field = request.GET.get('search_field', 'all')
     
-    if query:
-        if search_field == 'name':
-            s = ScammerDocument.search().query("nested", path="names", query=Q("match", **{"names.name": {"query": query, "analyzer": "edge_ngram_analyzer"}}))
-        elif search_field == 'phone':
-            s = ScammerDocument.search().query("nested", path="phone_numbers", query=Q("match", phone_numbers__phone_number=query))
-        elif search_field == 'email':
-            s = ScammerDocument.search().query("nested", path="emails", query=Q("match", emails__email=query))
-        elif search_field == 'website':
-            s = ScammerDocument.search().query("nested", path="websites", query=Q("match", websites__website=query))
-        elif search_field == 'tag':
-            s = ScammerDocument.search().query("nested", path="tags", query=Q("match", tags__name=query))
-        else: # 'all'
-            s = ScammerDocument.search().query(
-                "bool",
-                should=[
-                    Q("nested", path="names", query=Q("match", **{"names.name": {"query": query, "analyzer": "edge_ngram_analyzer"}})),
-                    Q("match", description=query),
-                    Q("nested", path="phone_numbers", query=Q("match", phone_numbers__phone_number=query)),
-                    Q("nested", path="emails", query=Q("match", emails__email=query)),
-                    Q("nested", path="websites", query=Q("match", websites__website=query)),
-                    Q("nested", path="tags", query=Q("match", tags__name=query)),
-                ]
-            )
-        
-        scammers_list = s.to_queryset()
-    else:
-        scammers_list = Scammer.objects.filter(status='approved').order_by('-approved_at')
+    def render_results():
+        page_obj = get_search_backend().scammer_page(query, search_field, request.GET.get('page'), 9, after=request.GET.get('after')) # 9 items per page
+        paginator = page_obj.paginator
 
+        # Calculate pagination window
+        window_size = 1
+        current_page = page_obj.number
+        total_pages = paginator.num_pages
+    
+        start = max(current_page - window_size, 1)
+        end = min(current_page + window_size, total_pages)
 
+        if start == 1:
+            end = min(start + (window_size * 2), total_pages)
+        if end == total_pages:
+            start = max(end - (window_size * 2), 1)
 
-    paginator = Paginator(scammers_list, 9) # 9 items per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        page_numbers = range(start, end + 1)
 
-    # Calculate pagination window
-    window_size = 1
-    current_page = page_obj.number
-    total_pages = paginator.num_pages
-    
-    start = max(current_page - window_size, 1)
-    end = min(current_page + window_size, total_pages)
+        context = {
+            'page_obj': page_obj,
+            'query': query,
+            'search_field': search_field,
+            'page_numbers': page_numbers,
+        }
+        return render_to_string('scammers/scammer_list_results.html', context, request=request)
 
-    if start == 1:
-        end = min(start + (window_size * 2), total_pages)
-    if end == total_pages:
-        start = max(end - (window_size * 2), 1)
-
-    page_numbers = range(start, end + 1)
+    # Popular searches are served from the cache until a signal bumps the scammers version
+    results_html = search_cache.cached(request, 'scammer_list', {
+        'q': search_cache.normalize_query(query),
+        'search_field': search_field,
+        'page': request.GET.get('page'),
+        'after': request.GET.get('after'),
+    }, render_results)
 
     context = {
-        'page_obj': page_obj,
         'query': query,
         'search_field': search_field,
-        'page_numbers': page_numbers,
+        'results_html': mark_safe(results_html),
     }
     return render(request, 'scammers/scammer_list.html', context)
 
@@ -94,11 +89,11 @@ def scammer_detail(request, pk):
 
     # Prepare related scammers data for the template
     related_data = []
-    if scammer.related_scammers.exists():
-        approved_related_scammers = scammer.related_scammers.filter(status='approved')
+    approved_related_scammers = list(scammer.related_scammers.filter(status='approved'))
+    if approved_related_scammers:
+        reasons = scammer.get_relationship_reasons_map([related.pk for related in approved_related_scammers])
         for related in approved_related_scammers:
-            reasons = scammer.get_relationship_reasons(related)
-            related_data.append({'scammer': related, 'reasons': reasons})
+            related_data.append({'scammer': related, 'reasons': reasons[related.pk]})
 
     # Prepare display values for sensitive fields
     display_phone_numbers = []
@@ -198,7 +193,6 @@ def add_scammer(request):
         image_formset = ScammerImageFormSet(prefix='images')
         payment_account_formset = ScammerPaymentAccountFormSet(prefix='payment_accounts')
 
-    all_tags = list(Tag.objects.values_list('name', flat=True))
     context = {
         'form': form,
         'name_formset': name_formset,
@@ -207,7 +201,6 @@ def add_scammer(request):
         'website_formset': website_formset,
         'image_formset': image_formset,
         'payment_account_formset': payment_account_formset,
-        'all_tags': all_tags,
     }
     return render(request, 'scammers/add_scammer.html', context)
 
@@ -217,17 +210,21 @@ def contact_us(request):
 @staff_member_required
 def approve_scammer(request, pk):
     scammer = get_object_or_404(Scammer, pk=pk)
+    old_status = scammer.status
     scammer.status = 'approved'
     scammer.approved_at = timezone.now()
     scammer.save()
+    scammer_status_changed.send(sender=Scammer, instance=scammer, old_status=old_status, new_status=scammer.status)
     return redirect('scammer_detail', pk=pk)
 
 @staff_member_required
 def reject_scammer(request, pk):
     scammer = get_object_or_404(Scammer, pk=pk)
+    old_status = scammer.status
     scammer.status = 'rejected'
     scammer.approved_at = None
     scammer.save()
+    scammer_status_changed.send(sender=Scammer, instance=scammer, old_status=old_status, new_status=scammer.status)
     return redirect('scammer_detail', pk=pk)
 
 @staff_member_required
@@ -258,51 +255,83 @@ def pending_scammers(request):
     }
     return render(request, 'scammers/pending_scammer_list.html', context)
 
+def submitted_case_ids(value):
+    """
+    Case ids from the cases field, sent as Tagify's JSON list or as comma-separated ids.
+    """
+    try:
+        case_ids = [str(item['value']) for item in json.loads(value)]
+    except (json.JSONDecodeError, TypeError, KeyError):
+        case_ids = value.split(',')
+    return [case_id.strip() for case_id in case_ids if case_id.strip().isdigit()]
+
 @staff_member_required
 def add_scammer_profile(request):
+    initial_cases = []
     if request.method == 'POST':
         form = ScammerProfileForm(request.POST, request.FILES)
+        case_ids = submitted_case_ids(request.POST.get('cases', ''))
         if form.is_valid():
-            profile = form.save(commit=False)
-            profile.save()
-
-            case_ids_string = form.cleaned_data.get('cases', '')
-            if case_ids_string:
-                try:
-                    import json
-                    case_data = json.loads(case_ids_string)
-                    case_ids = [item['value'] for item in case_data]
-                    
-                    profile.cases.clear()
-                    for case_id in case_ids:
-                        try:
-                            scammer = Scammer.objects.get(id=case_id)
-                            profile.cases.add(scammer)
-                        except Scammer.DoesNotExist:
-                            # Handle case where an invalid ID is entered
-                            pass
-                except (json.JSONDecodeError, TypeError):
-                    # Fallback for simple comma-separated string
-                    case_ids = [id.strip() for id in case_ids_string.split(',') if id.strip()]
-                    profile.cases.clear()
-                    for case_id in case_ids:
-                        try:
-                            scammer = Scammer.objects.get(id=case_id)
-                        except (Scammer.DoesNotExist, ValueError):
-                            # Handle invalid ID or non-integer
-                            pass
-            
+            profile = form.save()
+            # Ids that match no scammer are ignored
+            profile.cases.set(Scammer.objects.filter(pk__in=case_ids))
             return redirect('scammer_profile_list')
+        # An invalid form is shown again with the cases that were submitted
+        initial_cases = case_entries(Scammer.objects.filter(pk__in=case_ids).order_by('pk'))
     else:
         form = ScammerProfileForm()
+        # A cluster proposal prefills the cases with the cluster's approved members
+        cluster_id = request.GET.get('cluster')
+        if cluster_id and cluster_id.isdigit():
+            initial_cases = case_entries(Scammer.objects.filter(cluster_id=cluster_id, status='approved').order_by('pk'))
+            form = ScammerProfileForm(initial={'cases': json.dumps(initial_cases)})
 
-    all_case_ids = list(Scammer.objects.values_list('id', flat=True))
     context = {
         'form': form,
-        'all_case_ids': all_case_ids,
+        'initial_cases': initial_cases,
     }
     return render(request, 'scammers/add_scammer_profile.html', context)
 
+@staff_member_required
+def cluster_proposals(request):
+    paginator = Paginator(clustering.proposals(), 10)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    members = clustering.cluster_members([cluster['cluster_id'] for cluster in page_obj])
+    clusters = [
+        {'cluster_id': cluster['cluster_id'], 'size': cluster['size'], 'members': members[cluster['cluster_id']]}
+        for cluster in page_obj
+    ]
+    context = {
+        'page_obj': page_obj,
+        'clusters': clusters,
+    }
+    return render(request, 'scammers/cluster_proposals.html', context)
+
+@staff_member_required
+def name_match_candidates(request):
+    candidates = NameMatchCandidate.objects.filter(status='pending').select_related('scammer', 'candidate').order_by('-score', 'pk')
+    paginator = Paginator(candidates, 20)
+    context = {
+        'page_obj': paginator.get_page(request.GET.get('page')),
+    }
+    return render(request, 'scammers/name_match_candidates.html', context)
+
+@staff_member_required
+@require_POST
+def review_name_match(request, pk):
+    candidate = get_object_or_404(NameMatchCandidate, pk=pk, status='pending')
+    if request.POST.get('decision') == 'link':
+        with transaction.atomic():
+            fuzzy_names.link_candidate(candidate)
+            candidate.status = 'linked'
+            candidate.reviewed_at = timezone.now()
+            candidate.save()
+    elif request.POST.get('decision') == 'dismiss':
+        candidate.status = 'dismissed'
+        candidate.reviewed_at = timezone.now()
+        candidate.save()
+    return redirect('name_match_candidates')
+
 
 from .forms import CustomUserCreationForm
 
@@ -336,8 +365,7 @@ class ScammerProfileListView(ListView):
     def get_queryset(self):
         query = self.request.GET.get('q', '')
         if query:
-            s = ScammerProfileDocument.search().query("match", **{"name": {"query": query, "analyzer": "edge_ngram_analyzer"}})
-            return s.to_queryset()
+            return get_search_backend().profile_results(query)
         return ScammerProfile.objects.all()
 
     def get_context_data(self, **kwargs):